@@ -4,12 +4,18 @@ YOLOv9データセット分析・推定エンジン
 """
 
 import os
+import re
 import json
 import glob
-from collections import defaultdict
+import hashlib
+from functools import lru_cache
+from collections import Counter
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 
+from utils.file_utils import scan_image_json_files
+from utils.labelme_loader import load_labelme
+
 
 class BeginnerFriendlyYOLOEstimator:
     """初心者向けYOLOv9軽量モデル用ラベル推定"""
@@ -39,6 +45,25 @@ class BeginnerFriendlyYOLOEstimator:
         640: {'倍率': 1.0, '説明': '標準的なバランス'},
         1280: {'倍率': 1.4, '説明': '高精度だが時間かかる'},
     }
+    
+    # 複雑度判定キーワード（部分一致）
+    SIMPLE_KEYWORDS = ('人', 'car', 'truck', 'dog', 'cat', 'bird', '車', '犬', '猫')
+    COMPLEX_KEYWORDS = ('screw', 'component', 'part', 'text', 'label', 'ネジ', '部品', '文字')
+    
+    # キーワードを1つの正規表現にまとめて事前コンパイル
+    _SIMPLE_PATTERN = re.compile('|'.join(map(re.escape, SIMPLE_KEYWORDS)))
+    _COMPLEX_PATTERN = re.compile('|'.join(map(re.escape, COMPLEX_KEYWORDS)))
+    
+    # 分析結果のディスクキャッシュ（フォルダごとに1ファイル、形式を変えたら CACHE_VERSION を上げる）
+    CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'yolo-analyzer', 'analysis')
+    CACHE_VERSION = 2
+
+    def __init__(self, use_cache: bool = True):
+        """
+        Args:
+            use_cache: フォルダ分析結果をディスクにキャッシュするか
+        """
+        self.use_cache = use_cache
 
     def analyze_mixed_folder(self, folder_path: str) -> Dict:
         """
@@ -50,35 +75,22 @@ class BeginnerFriendlyYOLOEstimator:
         Returns:
             分析結果辞書
         """
-        if not os.path.exists(folder_path):
+        # ファイル自動識別（フォルダ確認・変換と同じ対応付け）
+        try:
+            images, _, labeled_pairs = scan_image_json_files(folder_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"フォルダが見つかりません: {folder_path}")
         
-        # ファイル自動識別
-        all_files = os.listdir(folder_path)
-        
-        image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
-        image_files = [f for f in all_files if f.lower().endswith(image_extensions)]
-        json_files = [f for f in all_files if f.lower().endswith('.json')]
-        
-        # ペア確認（同名の画像とJSONがあるか）
-        labeled_pairs = []
-        unlabeled_images = []
+        # ペアになっていない画像（元の順序のまま）
+        labeled_images = {img_file for img_file, _ in labeled_pairs}
+        unlabeled_images = [img_file for img_file in images if img_file not in labeled_images]
         
-        for img_file in image_files:
-            img_name = os.path.splitext(img_file)[0]
-            json_name = img_name + '.json'
-            
-            if json_name in json_files:
-                labeled_pairs.append((img_file, json_name))
-            else:
-                unlabeled_images.append(img_file)
-        
-        label_rate = (len(labeled_pairs) / len(image_files) * 100) if image_files else 0
+        label_rate = (len(labeled_pairs) / len(images) * 100) if images else 0
         
         return {
             'ラベル済み画像数': len(labeled_pairs),
             '未ラベル画像数': len(unlabeled_images),
-            '全画像数': len(image_files),
+            '全画像数': len(images),
             'ラベル率': round(label_rate, 1),
             'labeled_pairs': labeled_pairs,
             'unlabeled_images': unlabeled_images,
@@ -96,31 +108,122 @@ class BeginnerFriendlyYOLOEstimator:
         Returns:
             クラス名: 出現回数の辞書
         """
-        class_counts = defaultdict(int)
+        class_counts = Counter()
         
         for img_file, json_file in labeled_pairs:
             json_path = os.path.join(folder_path, json_file)
             
             try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                # 矩形かつラベル名ありのものだけが抽出済み
+                annotation = load_labelme(json_path)
                 
-                # labelmeのshapes配列からラベルを抽出
-                for shape in data.get('shapes', []):
-                    if shape.get('shape_type') == 'rectangle':
-                        label = shape.get('label', '').strip()
-                        if label:
-                            class_counts[label] += 1
+                # ファイル単位でまとめて加算（Counter.update はC実装）
+                class_counts.update(box[0] for box in annotation.boxes)
                             
-            except (json.JSONDecodeError, KeyError, FileNotFoundError) as e:
+            except (ValueError, KeyError, IndexError, TypeError, OSError) as e:
                 print(f"警告: {json_file} の読み込みに失敗: {e}")
                 continue
         
         return dict(class_counts)
 
-    def judge_complexity_simple(self, class_name: str) -> str:
+    def analyze_folder_and_classes(self, folder_path: str,
+                                   fingerprint: Optional[str] = None) -> Tuple[Dict, Dict[str, int]]:
+        """
+        フォルダ分析とクラス集計をまとめて実行
+        
+        フォルダ内のファイル（名前・更新時刻・サイズ）が前回と同じなら
+        ディスクキャッシュの結果を返し、JSONの再読み込みを省略する
+        （キャッシュはフォルダごとに1ファイルで、内容が変わったら上書きする）
+        
+        Args:
+            folder_path: 分析対象フォルダパス
+            fingerprint: 計算済みの folder_fingerprint（省略時はここで計算）
+        
+        Returns:
+            (フォルダ分析結果, クラス名: 出現回数)
+        """
+        cache_path = None
+        if self.use_cache:
+            try:
+                if fingerprint is None:
+                    fingerprint = self.folder_fingerprint(folder_path)
+                cache_path = self._get_cache_path(folder_path)
+            except OSError:
+                pass  # フォルダが読めない → キャッシュを使わず分析（エラーは分析側で出す）
+        
+        if cache_path:
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                
+                # 指紋が違えばフォルダの内容が変わっている → 分析し直して上書き
+                if cached['fingerprint'] == fingerprint:
+                    folder_stats = cached['folder_stats']
+                    folder_stats['labeled_pairs'] = [tuple(pair) for pair in folder_stats['labeled_pairs']]
+                    folder_stats['folder_path'] = folder_path
+                    return folder_stats, cached['class_stats']
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # キャッシュなし・破損 → 通常どおり分析
+        
+        folder_stats = self.analyze_mixed_folder(folder_path)
+        
+        class_stats = {}
+        if folder_stats['ラベル済み画像数'] > 0:
+            class_stats = self.analyze_classes_from_json(
+                folder_stats['folder_path'], 
+                folder_stats['labeled_pairs']
+            )
+        
+        if cache_path:
+            try:
+                os.makedirs(self.CACHE_DIR, exist_ok=True)
+                tmp_path = cache_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(
+                        {'fingerprint': fingerprint, 'folder_stats': folder_stats, 'class_stats': class_stats},
+                        f, ensure_ascii=False
+                    )
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass  # キャッシュ保存に失敗しても分析結果はそのまま返す
+        
+        return folder_stats, class_stats
+
+    def _get_cache_path(self, folder_path: str) -> str:
+        """フォルダの絶対パスからキャッシュファイルのパスを決定"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{self.CACHE_VERSION}\0{os.path.abspath(folder_path)}".encode('utf-8', 'surrogateescape'))
+        return os.path.join(self.CACHE_DIR, digest.hexdigest() + '.json')
+
+    @classmethod
+    def folder_fingerprint(cls, folder_path: str) -> str:
         """
-        クラス名から複雑度を簡易判定
+        フォルダ内の (ファイル名, 更新時刻, サイズ) から指紋ハッシュを計算
+        
+        リンク切れ・読めないファイルは飛ばす（フォルダ自体が読めなければ OSError）
+        """
+        entries = []
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        entries.append((entry.name, st.st_mtime_ns, st.st_size))
+                except OSError:
+                    continue
+        
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{cls.CACHE_VERSION}\0{os.path.abspath(folder_path)}\n".encode('utf-8', 'surrogateescape'))
+        for name, mtime_ns, size in sorted(entries):
+            digest.update(f"{name}\0{mtime_ns}\0{size}\n".encode('utf-8', 'surrogateescape'))
+        
+        return digest.hexdigest()
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def judge_complexity_simple(cls, class_name: str) -> str:
+        """
+        クラス名から複雑度を簡易判定（同じクラス名の判定結果はキャッシュ）
         
         Args:
             class_name: クラス名
@@ -128,17 +231,14 @@ class BeginnerFriendlyYOLOEstimator:
         Returns:
             'simple_objects' | 'medium_objects' | 'complex_objects'
         """
-        simple_keywords = ['人', 'car', 'truck', 'dog', 'cat', 'bird', '車', '犬', '猫']
-        complex_keywords = ['screw', 'component', 'part', 'text', 'label', 'ネジ', '部品', '文字']
-        
         class_lower = class_name.lower()
         
         # シンプルなオブジェクト
-        if any(keyword in class_lower for keyword in simple_keywords):
+        if cls._SIMPLE_PATTERN.search(class_lower):
             return 'simple_objects'
         
         # 複雑なオブジェクト
-        if any(keyword in class_lower for keyword in complex_keywords):
+        if cls._COMPLEX_PATTERN.search(class_lower):
             return 'complex_objects'
         
         # デフォルトは中程度
@@ -159,9 +259,28 @@ class BeginnerFriendlyYOLOEstimator:
         Returns:
             分かりやすい推奨結果
         """
-        # フォルダ分析
-        folder_stats = self.analyze_mixed_folder(folder_path)
+        # フォルダ分析 + クラス分析（内容が変わっていなければキャッシュから）
+        folder_stats, class_stats = self.analyze_folder_and_classes(folder_path)
+        
+        return self.recommend_from_stats(folder_stats, class_stats, target_accuracy, image_size)
+
+    def recommend_from_stats(self,
+                             folder_stats: Dict,
+                             class_stats: Dict[str, int],
+                             target_accuracy: str = '正解率70%目標',
+                             image_size: int = 640) -> Dict:
+        """
+        分析済みのフォルダ・クラス集計から推奨値を計算（ファイルは読まない）
         
+        Args:
+            folder_stats: analyze_folder_and_classes のフォルダ分析結果
+            class_stats: analyze_folder_and_classes のクラス集計
+            target_accuracy: '正解率60%目標' | '正解率70%目標' | '正解率80%目標'
+            image_size: 320 | 640 | 1280
+            
+        Returns:
+            分かりやすい推奨結果
+        """
         if folder_stats['ラベル済み画像数'] == 0:
             return {
                 'エラー': True,
@@ -170,12 +289,6 @@ class BeginnerFriendlyYOLOEstimator:
                 '推奨開始数': '最初は各クラス10-20枚から始めましょう'
             }
         
-        # クラス分析
-        class_stats = self.analyze_classes_from_json(
-            folder_stats['folder_path'], 
-            folder_stats['labeled_pairs']
-        )
-        
         if not class_stats:
             return {
                 'エラー': True,
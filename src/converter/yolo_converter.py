@@ -4,35 +4,56 @@ labelme → YOLO形式変換エンジン
 """
 
 import os
-import json
+import sys
 import shutil
-import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, NamedTuple, Tuple, Optional
 from collections import defaultdict
+import numpy as np
 import yaml
 
+from utils.file_utils import scan_image_json_files
+from utils.labelme_loader import LabelmeAnnotation, load_labelme
+
+
+# reflink 用 ioctl（Linux のみ。FICLONE = _IOW(0x94, 9, int)）
+try:
+    import fcntl
+    _FICLONE = 0x40049409 if sys.platform.startswith('linux') else None
+except ImportError:
+    _FICLONE = None
+
+# YOLOラベル1行分の書式（クラスID 中心x 中心y 幅 高さ）
+YOLO_LINE_FORMAT = "%d %.6f %.6f %.6f %.6f\n"
+
+
+class ParsedPair(NamedTuple):
+    """JSON解析済みの画像+JSONペア"""
+    img_file: str
+    json_file: str
+    annotation: Optional[LabelmeAnnotation]  # 読み込み失敗時は None
+    error: Optional[str]                     # 読み込み失敗時のエラー内容
+
 
 class YOLOConverter:
     """labelme形式からYOLO形式への変換"""
     
-    def __init__(self):
-        self.class_mapping = {}  # クラス名 → インデックス
-        self.conversion_stats = {
-            'total_images': 0,
-            'converted_images': 0,
-            'skipped_images': 0,
-            'total_annotations': 0,
-            'class_counts': defaultdict(int),
-            'errors': []
-        }
+    # この件数以上のペアはプロセスプールで並列変換
+    PARALLEL_MIN_PAIRS = 64
+    
+    # プロセスプールを使わない場合のI/Oスレッド数
+    IO_THREADS = 4
     
     def convert_dataset(self, 
                        input_folder: str, 
                        output_folder: str,
                        train_ratio: float = 0.8,
                        copy_images: bool = True,
-                       target_size: Optional[Tuple[int, int]] = None) -> Dict:
+                       target_size: Optional[Tuple[int, int]] = None,
+                       link_images: bool = False,
+                       seed: Optional[int] = None,
+                       progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
         """
         データセット全体を変換
         
@@ -42,61 +63,60 @@ class YOLOConverter:
             train_ratio: 訓練データの割合 (0.0-1.0)
             copy_images: 画像ファイルもコピーするか
             target_size: リサイズ目標サイズ (width, height)
+            link_images: 画像をハードリンクで配置するか（同一ドライブなら高速・容量ゼロ）
+            seed: train/val分割の乱数シード（指定すると毎回同じ分割になる）
+            progress_callback: 1ペア変換するたびに (変換済み数, 総数) で呼ばれる関数
             
         Returns:
             変換結果の詳細
         """
         
-        # 初期化
-        self._reset_stats()
+        # ファイル一覧取得（入力フォルダが無ければここで FileNotFoundError）
+        image_json_pairs = self._get_image_json_pairs(input_folder)
         
-        # 入力フォルダの検証
-        if not os.path.exists(input_folder):
-            raise FileNotFoundError(f"入力フォルダが見つかりません: {input_folder}")
+        if not image_json_pairs:
+            raise ValueError("有効な画像とJSONのペアが見つかりません")
         
         # 出力フォルダの準備
         self._prepare_output_folders(output_folder)
         
-        # ファイル一覧取得
-        image_json_pairs = self._get_image_json_pairs(input_folder)
-        
-        if not image_json_pairs:
-            raise ValueError("有効な画像とJSONのペアが見つかりません")
+        # 全JSONを1回だけ解析し、クラス情報の収集と変換の両方で使う
+        parsed_pairs = self._parse_all(input_folder, image_json_pairs)
         
-        # クラス情報の収集
-        self._collect_class_info(input_folder, image_json_pairs)
+        # クラス情報の収集（変換ごとの状態はインスタンスに持たせず、1つの変換器を使い回せるようにする）
+        class_mapping = self._collect_class_info(parsed_pairs)
+        class_counts = defaultdict(int)
         
         # train/val分割
-        train_pairs, val_pairs = self._split_train_val(image_json_pairs, train_ratio)
+        train_pairs, val_pairs = self._split_train_val(parsed_pairs, train_ratio, seed)
+        
+        # 進捗通知（train/val を通した通し番号で呼ぶ）
+        total = len(parsed_pairs)
+        done = 0
+        
+        def notify_pair_done():
+            nonlocal done
+            done += 1
+            progress_callback(done, total)
+        
+        on_pair_done = notify_pair_done if progress_callback is not None else None
         
         # 変換実行
         train_stats = self._convert_split(
             input_folder, output_folder, train_pairs, 'train', 
-            copy_images, target_size
+            class_mapping, class_counts, copy_images, target_size, link_images, on_pair_done
         )
         
         val_stats = self._convert_split(
             input_folder, output_folder, val_pairs, 'val', 
-            copy_images, target_size
+            class_mapping, class_counts, copy_images, target_size, link_images, on_pair_done
         )
         
         # 設定ファイル生成
-        self._generate_config_files(output_folder)
+        self._generate_config_files(output_folder, class_mapping)
         
         # 結果サマリー
-        return self._generate_summary(output_folder, train_stats, val_stats)
-    
-    def _reset_stats(self):
-        """統計情報をリセット"""
-        self.conversion_stats = {
-            'total_images': 0,
-            'converted_images': 0,
-            'skipped_images': 0,
-            'total_annotations': 0,
-            'class_counts': defaultdict(int),
-            'errors': []
-        }
-        self.class_mapping = {}
+        return self._generate_summary(output_folder, train_stats, val_stats, class_mapping, class_counts)
     
     def _prepare_output_folders(self, output_folder: str):
         """出力フォルダ構造を準備"""
@@ -112,69 +132,66 @@ class YOLOConverter:
             os.makedirs(folder_path, exist_ok=True)
     
     def _get_image_json_pairs(self, folder_path: str) -> List[Tuple[str, str]]:
-        """画像とJSONファイルのペア一覧を取得"""
-        pairs = []
-        
-        # 対応する拡張子
-        image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
-        
-        all_files = os.listdir(folder_path)
-        image_files = [f for f in all_files if f.lower().endswith(image_extensions)]
-        
-        for img_file in image_files:
-            img_name = os.path.splitext(img_file)[0]
-            json_file = img_name + '.json'
-            
-            if json_file in all_files:
-                pairs.append((img_file, json_file))
+        """画像とJSONファイルのペア一覧を取得（フォルダ確認・分析と同じ対応付け）"""
+        try:
+            _, _, pairs = scan_image_json_files(folder_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"入力フォルダが見つかりません: {folder_path}")
         
         return pairs
     
-    def _collect_class_info(self, input_folder: str, pairs: List[Tuple[str, str]]):
-        """全JSONファイルからクラス情報を収集"""
-        all_classes = set()
+    def _parse_all(self, input_folder: str, pairs: List[Tuple[str, str]]) -> List[ParsedPair]:
+        """全ペアのJSONを解析（読み込みに失敗したペアはエラー内容を保持）"""
+        parsed_pairs = []
         
         for img_file, json_file in pairs:
             json_path = os.path.join(input_folder, json_file)
             
             try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                for shape in data.get('shapes', []):
-                    if shape.get('shape_type') == 'rectangle':
-                        label = shape.get('label', '').strip()
-                        if label:
-                            all_classes.add(label)
-                            
+                parsed_pairs.append(ParsedPair(img_file, json_file, load_labelme(json_path), None))
             except Exception as e:
-                self.conversion_stats['errors'].append(f"クラス情報収集エラー {json_file}: {e}")
+                parsed_pairs.append(ParsedPair(img_file, json_file, None, str(e)))
+        
+        return parsed_pairs
+    
+    def _collect_class_info(self, parsed_pairs: List[ParsedPair]) -> Dict[str, int]:
+        """解析済みJSONからクラス情報を収集（読み込みに失敗したペアは変換時にエラーとして記録される）"""
+        all_classes = set()
+        
+        for parsed in parsed_pairs:
+            if parsed.annotation is not None:
+                all_classes.update(box[0] for box in parsed.annotation.boxes)
         
-        # クラス名をソートしてインデックス割り当て
+        # クラス名をソートしてインデックス割り当て（クラス名 → インデックス）
         sorted_classes = sorted(list(all_classes))
-        self.class_mapping = {cls: idx for idx, cls in enumerate(sorted_classes)}
+        return {cls: idx for idx, cls in enumerate(sorted_classes)}
     
-    def _split_train_val(self, pairs: List[Tuple[str, str]], train_ratio: float) -> Tuple[List, List]:
+    def _split_train_val(self, pairs: List, train_ratio: float,
+                         seed: Optional[int] = None) -> Tuple[List, List]:
         """データをtrain/valに分割"""
-        # シャッフル
-        shuffled_pairs = pairs.copy()
-        random.shuffle(shuffled_pairs)
+        # シャッフル（インデックスの並べ替えをNumPyでまとめて生成）
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(pairs)).tolist()
         
         # 分割
-        split_idx = int(len(shuffled_pairs) * train_ratio)
-        train_pairs = shuffled_pairs[:split_idx]
-        val_pairs = shuffled_pairs[split_idx:]
+        split_idx = int(len(pairs) * train_ratio)
+        train_pairs = [pairs[i] for i in order[:split_idx]]
+        val_pairs = [pairs[i] for i in order[split_idx:]]
         
         return train_pairs, val_pairs
     
     def _convert_split(self, 
                       input_folder: str, 
                       output_folder: str, 
-                      pairs: List[Tuple[str, str]], 
+                      pairs: List[ParsedPair], 
                       split_name: str,
+                      class_mapping: Dict[str, int],
+                      class_counts: Dict[str, int],
                       copy_images: bool,
-                      target_size: Optional[Tuple[int, int]]) -> Dict:
-        """分割データを変換"""
+                      target_size: Optional[Tuple[int, int]],
+                      link_images: bool = False,
+                      on_pair_done: Optional[Callable[[], None]] = None) -> Dict:
+        """分割データを変換（件数が多ければ複数プロセスで並列変換）"""
         
         split_stats = {
             'converted': 0,
@@ -183,104 +200,51 @@ class YOLOConverter:
             'errors': []
         }
         
-        for img_file, json_file in pairs:
-            try:
-                result = self._convert_single_pair(
-                    input_folder, output_folder, img_file, json_file, 
-                    split_name, copy_images, target_size
-                )
-                
-                if result['success']:
-                    split_stats['converted'] += 1
-                    split_stats['annotations'] += result['annotation_count']
-                else:
-                    split_stats['skipped'] += 1
-                    split_stats['errors'].append(result['error'])
-                    
-            except Exception as e:
+        tasks = [
+            (input_folder, output_folder, parsed,
+             split_name, copy_images, target_size, class_mapping, link_images)
+            for parsed in pairs
+        ]
+        
+        workers = os.cpu_count() or 1
+        
+        if workers > 1 and len(tasks) >= self.PARALLEL_MIN_PAIRS:
+            # IPCのオーバーヘッドを抑えるためまとめて渡す
+            executor = ProcessPoolExecutor(max_workers=workers)
+            map_options = {'chunksize': max(1, len(tasks) // (workers * 4))}
+        else:
+            # 少量ならプロセス起動の方が高くつくのでスレッドで処理
+            # （大半は画像コピーとラベル書き込みのI/OでGILを解放するため、ペア同士で重なる）
+            executor = ThreadPoolExecutor(max_workers=self.IO_THREADS)
+            map_options = {}
+        
+        results = []
+        with executor:
+            for result in executor.map(_convert_pair_task, tasks, **map_options):
+                results.append(result)
+                if on_pair_done is not None:
+                    on_pair_done()
+        
+        # 統計は呼び出し側プロセスで集計
+        for result in results:
+            if result['success']:
+                split_stats['converted'] += 1
+                split_stats['annotations'] += result['annotation_count']
+                for label, count in result['class_counts'].items():
+                    class_counts[label] += count
+            else:
                 split_stats['skipped'] += 1
-                split_stats['errors'].append(f"{img_file}: {e}")
+                split_stats['errors'].append(result['error'])
         
         return split_stats
     
-    def _convert_single_pair(self, 
-                           input_folder: str, 
-                           output_folder: str,
-                           img_file: str, 
-                           json_file: str, 
-                           split_name: str,
-                           copy_images: bool,
-                           target_size: Optional[Tuple[int, int]]) -> Dict:
-        """単一の画像+JSONペアを変換"""
-        
-        # ファイルパス
-        img_path = os.path.join(input_folder, img_file)
-        json_path = os.path.join(input_folder, json_file)
-        
-        # JSON読み込み
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 画像サイズ取得
-        img_width = data['imageWidth']
-        img_height = data['imageHeight']
-        
-        # アノテーション変換
-        yolo_annotations = []
-        annotation_count = 0
-        
-        for shape in data.get('shapes', []):
-            if shape.get('shape_type') == 'rectangle':
-                label = shape.get('label', '').strip()
-                
-                if label in self.class_mapping:
-                    # 座標変換
-                    points = shape['points']
-                    x1, y1 = points[0]
-                    x2, y2 = points[1]
-                    
-                    # YOLO形式に変換（中心点 + 幅・高さ、正規化）
-                    center_x = (x1 + x2) / 2 / img_width
-                    center_y = (y1 + y2) / 2 / img_height
-                    width = abs(x2 - x1) / img_width
-                    height = abs(y2 - y1) / img_height
-                    
-                    class_id = self.class_mapping[label]
-                    yolo_annotations.append(f"{class_id} {center_x:.6f} {center_y:.6f} {width:.6f} {height:.6f}")
-                    annotation_count += 1
-                    
-                    # 統計更新
-                    self.conversion_stats['class_counts'][label] += 1
-        
-        # ファイル名準備
-        base_name = os.path.splitext(img_file)[0]
-        
-        # 画像コピー
-        if copy_images:
-            dst_img_path = os.path.join(output_folder, 'images', split_name, img_file)
-            shutil.copy2(img_path, dst_img_path)
-        
-        # ラベルファイル作成
-        label_file = base_name + '.txt'
-        dst_label_path = os.path.join(output_folder, 'labels', split_name, label_file)
-        
-        with open(dst_label_path, 'w', encoding='utf-8') as f:
-            for annotation in yolo_annotations:
-                f.write(annotation + '\n')
-        
-        return {
-            'success': True,
-            'annotation_count': annotation_count,
-            'error': None
-        }
-    
-    def _generate_config_files(self, output_folder: str):
+    def _generate_config_files(self, output_folder: str, class_mapping: Dict[str, int]):
         """YOLO設定ファイル生成"""
         
         # classes.names ファイル
         names_path = os.path.join(output_folder, 'classes.names')
         with open(names_path, 'w', encoding='utf-8') as f:
-            for class_name in sorted(self.class_mapping.keys()):
+            for class_name in sorted(class_mapping.keys()):
                 f.write(class_name + '\n')
         
         # dataset.yaml ファイル
@@ -288,8 +252,8 @@ class YOLOConverter:
             'path': os.path.abspath(output_folder),
             'train': 'images/train',
             'val': 'images/val',
-            'nc': len(self.class_mapping),
-            'names': sorted(self.class_mapping.keys())
+            'nc': len(class_mapping),
+            'names': sorted(class_mapping.keys())
         }
         
         yaml_path = os.path.join(output_folder, 'dataset.yaml')
@@ -315,7 +279,8 @@ class YOLOConverter:
             f.write("YOLOv9の学習時に dataset.yaml を指定してください\n")
             f.write("例: python train.py --data dataset.yaml\n")
     
-    def _generate_summary(self, output_folder: str, train_stats: Dict, val_stats: Dict) -> Dict:
+    def _generate_summary(self, output_folder: str, train_stats: Dict, val_stats: Dict,
+                          class_mapping: Dict[str, int], class_counts: Dict[str, int]) -> Dict:
         """変換結果のサマリーを生成"""
         
         total_converted = train_stats['converted'] + val_stats['converted']
@@ -331,10 +296,10 @@ class YOLOConverter:
                 '総アノテーション数': total_annotations,
                 '訓練データ数': train_stats['converted'],
                 '検証データ数': val_stats['converted'],
-                'クラス数': len(self.class_mapping)
+                'クラス数': len(class_mapping)
             },
-            'クラス情報': dict(self.conversion_stats['class_counts']),
-            'クラスマッピング': self.class_mapping,
+            'クラス情報': dict(class_counts),
+            'クラスマッピング': class_mapping,
             '出力ファイル': {
                 'dataset.yaml': os.path.join(output_folder, 'dataset.yaml'),
                 'classes.names': os.path.join(output_folder, 'classes.names'),
@@ -353,27 +318,25 @@ class YOLOConverter:
             'statistics': {}
         }
         
-        # 必須ファイル・フォルダの確認
-        required_items = [
-            'images/train',
-            'images/val',
-            'labels/train', 
-            'labels/val',
-            'dataset.yaml'
-        ]
-        
-        for item in required_items:
-            path = os.path.join(yolo_folder, item)
-            if not os.path.exists(path):
+        # 必須フォルダの確認と件数カウント（存在確認も scandir 1回で兼ねる）
+        counts = {}
+        for item in ('images/train', 'images/val', 'labels/train', 'labels/val'):
+            try:
+                counts[item] = _count_entries(os.path.join(yolo_folder, item))
+            except (FileNotFoundError, NotADirectoryError):
                 validation_result['errors'].append(f"必須項目が見つかりません: {item}")
                 validation_result['valid'] = False
         
+        if not os.path.isfile(os.path.join(yolo_folder, 'dataset.yaml')):
+            validation_result['errors'].append("必須項目が見つかりません: dataset.yaml")
+            validation_result['valid'] = False
+        
         if validation_result['valid']:
             # 統計情報収集
-            train_images = len(os.listdir(os.path.join(yolo_folder, 'images/train')))
-            val_images = len(os.listdir(os.path.join(yolo_folder, 'images/val')))
-            train_labels = len(os.listdir(os.path.join(yolo_folder, 'labels/train')))
-            val_labels = len(os.listdir(os.path.join(yolo_folder, 'labels/val')))
+            train_images = counts['images/train']
+            val_images = counts['images/val']
+            train_labels = counts['labels/train']
+            val_labels = counts['labels/val']
             
             validation_result['statistics'] = {
                 '訓練画像数': train_images,
@@ -389,4 +352,163 @@ class YOLOConverter:
             if val_images != val_labels:
                 validation_result['warnings'].append(f"検証データの画像数とラベル数が不一致: {val_images} vs {val_labels}")
         
-        return validation_result
\ No newline at end of file
+        return validation_result
+
+
+def convert_single_pair(input_folder: str, 
+                        output_folder: str,
+                        img_file: str, 
+                        annotation: LabelmeAnnotation, 
+                        split_name: str,
+                        copy_images: bool,
+                        target_size: Optional[Tuple[int, int]],
+                        class_mapping: Dict[str, int],
+                        link_images: bool = False) -> Dict:
+    """
+    単一の画像+JSONペアを変換
+    
+    プロセスプールから呼べるようにモジュール関数として定義。
+    JSONは呼び出し側で解析済みのもの（annotation）を受け取る
+    
+    Returns:
+        変換結果（クラス別アノテーション数を含む）
+    """
+    
+    # ファイルパス
+    img_path = os.path.join(input_folder, img_file)
+    
+    # 画像サイズ取得（JSONに無ければ画像ヘッダーから読む）
+    img_width, img_height = annotation.image_width, annotation.image_height
+    if not img_width or not img_height:
+        img_width, img_height = _read_image_size(img_path)
+    
+    # 変換対象クラスの矩形を1回の走査で抽出（ループ内はローカル変数のみ参照）
+    get_class_id = class_mapping.get
+    class_ids, coords = [], []
+    append_id, append_coord = class_ids.append, coords.append
+    class_counts = defaultdict(int)
+    
+    for label, x1, y1, x2, y2 in annotation.boxes:
+        class_id = get_class_id(label)
+        if class_id is not None:
+            append_id(class_id)
+            append_coord((x1, y1, x2, y2))
+            class_counts[label] += 1
+    
+    annotation_count = len(class_ids)
+    label_text = ''
+    
+    if class_ids:
+        coords = np.array(coords, dtype=np.float64)  # (N, 4): x1, y1, x2, y2
+        yolo_boxes = _labelme_to_yolo(coords, img_width, img_height)
+        rows = np.column_stack([np.array(class_ids, dtype=np.float64), yolo_boxes])
+        
+        label_text = (YOLO_LINE_FORMAT * annotation_count) % tuple(rows.ravel().tolist())
+    
+    # ファイル名準備
+    base_name = os.path.splitext(img_file)[0]
+    
+    # 画像コピー
+    if copy_images:
+        dst_img_path = os.path.join(output_folder, 'images', split_name, img_file)
+        _fast_copy(img_path, dst_img_path, link_images)
+    
+    # ラベルファイル作成
+    label_file = base_name + '.txt'
+    dst_label_path = os.path.join(output_folder, 'labels', split_name, label_file)
+    
+    # 1回の write で書き出し（バイナリなので改行変換も行わない）
+    with open(dst_label_path, 'wb') as f:
+        f.write(label_text.encode('utf-8'))
+    
+    return {
+        'success': True,
+        'annotation_count': annotation_count,
+        'class_counts': dict(class_counts),
+        'error': None
+    }
+
+
+def _labelme_to_yolo(coords: np.ndarray, img_width: float, img_height: float) -> np.ndarray:
+    """
+    矩形の座標 (N, 4: x1, y1, x2, y2) をYOLO形式（中心x, 中心y, 幅, 高さ、0〜1に正規化）に変換
+    
+    全矩形をまとめてNumPyで計算する（1画像あたりの矩形は少ないので、JIT化しても速くならない）
+    """
+    scale = np.array([img_width, img_height], dtype=np.float64)
+    
+    centers = (coords[:, :2] + coords[:, 2:]) / 2 / scale
+    sizes = np.abs(coords[:, 2:] - coords[:, :2]) / scale
+    return np.hstack([centers, sizes])
+
+
+def _convert_pair_task(task: Tuple) -> Dict:
+    """convert_single_pair の引数タプル版（例外は失敗結果として返す）"""
+    input_folder, output_folder, parsed, *options = task
+    error = parsed.error
+    
+    if error is None:
+        try:
+            return convert_single_pair(input_folder, output_folder, parsed.img_file, parsed.annotation, *options)
+        except Exception as e:
+            error = str(e)
+    
+    return {
+        'success': False,
+        'annotation_count': 0,
+        'class_counts': {},
+        'error': f"{parsed.img_file}: {error}"
+    }
+
+
+def _read_image_size(img_path: str) -> Tuple[int, int]:
+    """画像ヘッダーだけを読んでサイズを取得（画素はデコードしない）"""
+    try:
+        import imagesize
+    except ImportError:
+        imagesize = None
+    
+    if imagesize is not None:
+        width, height = imagesize.get(img_path)
+        if width > 0 and height > 0:
+            return width, height
+    
+    # Image.open は遅延読み込みなので size 参照だけならヘッダーのみ読む
+    from PIL import Image
+    with Image.open(img_path) as img:
+        return img.size
+
+
+def _count_entries(path: str) -> int:
+    """フォルダ内のエントリ数を数える（ファイル名のリストは作らない）"""
+    with os.scandir(path) as it:
+        return sum(1 for _ in it)
+
+
+def _fast_copy(src: str, dst: str, link: bool = False):
+    """
+    画像ファイルを出力先に配置（タイムスタンプ等のメタデータは複製しない）
+    
+    ハードリンク → reflink（btrfs/xfs等）→ 通常コピーの順に試す。
+    通常コピーの shutil.copyfile は Linux では sendfile でカーネル内コピーになる。
+    """
+    # 再変換時に前回の出力（ハードリンクの可能性あり）を上書きしないよう先に削除
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # 別ドライブ・非対応FS → コピーにフォールバック
+    
+    if _FICLONE is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass  # reflink非対応 → 通常コピー（dst は copyfile が上書き）
+    
+    shutil.copyfile(src, dst)
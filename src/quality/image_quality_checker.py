@@ -3,19 +3,77 @@
 初心者向け：分かりやすい結果表示
 """
 
+import io
 import os
+import hashlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import cv2
 import numpy as np
-from PIL import Image, ImageStat
+from PIL import Image, UnidentifiedImageError
 from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from collections import Counter
 import json
 
+# orjson があればレポート出力に使う（無ければ標準の json）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ぼけスコアは原寸の画素で計算（縮小すると値の尺度が変わり blur_threshold と比べられない）
+# 大きい画像は等間隔の横帯（BLUR_SAMPLE_BAND 行ずつ）だけを使い、計算量を BLUR_SAMPLE_PIXELS 画素程度に抑える
+BLUR_SAMPLE_PIXELS = 512 * 512
+BLUR_SAMPLE_BAND = 4
+
+# 問題判定に使う画像ごとの指標（閾値判定を配列全体でまとめて行う）
+_METRICS_DTYPE = np.dtype([
+    ('width', 'i4'), ('height', 'i4'),
+    ('brightness', 'f8'), ('contrast', 'f8'), ('blur', 'f8'),
+    ('file_size', 'i8'), ('aspect_ratio', 'f8')
+])
+
 
 class ImageQualityChecker:
     """画像品質チェック機能"""
     
-    def __init__(self):
+    # この枚数以上ならプロセスプールで並列チェック（少量はプロセス起動の方が高くつく）
+    PARALLEL_MIN_IMAGES = 32
+    
+    # プロセスプールを使わない場合のスレッド数（読み込み・デコード中はGILが解放される）
+    IO_THREADS = 4
+    
+    # 画像ごとのチェック結果のディスクキャッシュ（計算方法を変えたら CACHE_VERSION を上げる）
+    CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'yolo-analyzer', 'quality')
+    CACHE_VERSION = 3
+    
+    # 大規模データセットでは結果を間引いてメモリを O(画像数) にしない
+    DETAILS_MAX_IMAGES = 10000  # これより多いと既定で詳細結果を保持しない
+    ISSUE_LIST_CAP = 500        # 詳細を保持しない場合の問題種別ごとの保持件数
+    
+    # 改善提案の文面（優先度の高い問題から順に）
+    RECOMMENDATION_TEMPLATES = (
+        ('解像度不足', "📐 解像度不足の画像が{count}枚あります。リサイズまたは再撮影を検討してください。"),
+        ('ぼけ画像', "🌫️ ぼけている画像が{count}枚あります。ピントが合った画像に差し替えることをお勧めします。"),
+        ('明度問題', "💡 明度に問題のある画像が{count}枚あります。露出補正や照明調整を検討してください。"),
+        ('コントラスト不足', "🎨 コントラストが低い画像が{count}枚あります。画像編集でコントラストを上げてください。"),
+        ('ファイルサイズ異常', "📁 ファイルサイズに問題のある画像が{count}枚あります。適切な品質設定で保存し直してください。"),
+        ('読み込みエラー', "❌ 読み込みエラーの画像が{count}枚あります。ファイルが破損している可能性があります。"),
+    )
+    
+    # 品質スコアの境界値と状態（QUALITY_STATUS_SCORES[i] 点以上で QUALITY_STATUS_LABELS[i+1]）
+    QUALITY_STATUS_SCORES = (60, 75, 90)
+    QUALITY_STATUS_LABELS = ("🔴 要改善", "🟠 改善推奨", "🟡 良好", "🟢 優秀")
+    
+    def __init__(self, use_cache: bool = True, keep_details: Optional[bool] = None):
+        """
+        Args:
+            use_cache: 画像ごとのチェック結果をディスクにキャッシュするか
+            keep_details: 全画像の詳細結果と全問題を保持するか（None: 画像数で自動判定）
+        """
+        self.use_cache = use_cache
+        self.keep_details = keep_details
         self.quality_thresholds = {
             # 解像度チェック
             'min_width': 320,
@@ -34,7 +92,7 @@ class ImageQualityChecker:
             'contrast_optimal': 50,
             
             # ぼけ検出
-            'blur_threshold': 100,  # Laplacian variance
+            'blur_threshold': 100,  # Laplacian variance（原寸の画素で計算）
             'blur_warning': 200,
             
             # ファイルサイズ
@@ -62,11 +120,23 @@ class ImageQualityChecker:
         if not os.path.exists(folder_path):
             raise FileNotFoundError(f"フォルダが見つかりません: {folder_path}")
         
-        # 画像ファイル一覧取得
-        image_files = []
-        for file in os.listdir(folder_path):
-            if file.lower().endswith(image_extensions):
-                image_files.append(file)
+        # 画像ファイル一覧取得（scandirのエントリからサイズも一緒に取る）
+        # シンボリックリンクは分析・変換と同じくリンク先をたどる（リンク切れ・読めないものは飛ばす）
+        extensions = tuple(ext.lower() for ext in image_extensions)
+        image_files, image_paths, file_stats = [], [], []
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if not entry.name.lower().endswith(extensions):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                image_files.append(entry.name)
+                image_paths.append(entry.path)
+                file_stats.append((st.st_mtime_ns, st.st_size))
         
         if not image_files:
             return {
@@ -94,57 +164,71 @@ class ImageQualityChecker:
                 '平均明度': 0,
                 '平均コントラスト': 0,
                 '平均ファイルサイズ': 0,
-                '解像度分布': defaultdict(int),
-                'アスペクト比分布': defaultdict(int)
+                '解像度分布': {},
+                'アスペクト比分布': {}
             },
+            '品質問題件数': {},
+            '問題画像数': 0,
             '詳細結果': [],
             '推奨改善': []
         }
         
-        # 統計用変数
+        keep_details = self.keep_details
+        if keep_details is None:
+            keep_details = len(image_files) <= self.DETAILS_MAX_IMAGES
+        issue_cap = None if keep_details else self.ISSUE_LIST_CAP
+        
+        issue_counts = {
+            issue_type: {'件数': 0, '高重要度': 0}
+            for issue_type in results['品質問題']
+        }
+        results['品質問題件数'] = issue_counts
+        
+        # 統計用変数（明度・コントラストは Welford 法で平均とばらつきを逐次計算）
         total_width, total_height = 0, 0
-        total_brightness, total_contrast = 0, 0
+        brightness_stats, contrast_stats = _RunningStats(), _RunningStats()
         total_file_size = 0
         valid_images = 0
         
-        # 各画像をチェック
-        for i, image_file in enumerate(image_files):
-            image_path = os.path.join(folder_path, image_file)
-            
+        # 各画像をチェック（変更のない画像はキャッシュから、残りは並列で計算）
+        quality_results = self._check_images_cached(folder_path, image_files, image_paths, file_stats)
+        
+        # 問題判定用の指標（正常に読めた画像だけ詰めて格納し、最後にまとめて判定）
+        metrics = np.empty(len(image_files), dtype=_METRICS_DTYPE)
+        metric_files = []
+        read_errors = []
+        
+        # 集計はメインプロセスで行う
+        for i, (image_file, quality_result) in enumerate(zip(image_files, quality_results)):
             try:
-                # 個別画像チェック
-                quality_result = self.check_single_image(image_path)
-                
                 if not quality_result['エラー']:
-                    valid_images += 1
-                    
                     # 統計更新
                     width, height = quality_result['解像度']['width'], quality_result['解像度']['height']
+                    brightness_stats.add(quality_result['明度'])
+                    contrast_stats.add(quality_result['コントラスト'])
                     total_width += width
                     total_height += height
-                    total_brightness += quality_result['明度']
-                    total_contrast += quality_result['コントラスト']
                     total_file_size += quality_result['ファイルサイズ']
+                    valid_images += 1
                     
-                    # 分布更新
-                    resolution_key = f"{width}x{height}"
-                    results['品質統計']['解像度分布'][resolution_key] += 1
-                    
-                    aspect_ratio = width / height
-                    aspect_key = f"{aspect_ratio:.1f}:1"
-                    results['品質統計']['アスペクト比分布'][aspect_key] += 1
-                    
-                    # 問題のチェック
-                    self._categorize_quality_issues(quality_result, results['品質問題'], image_file)
+                    # 問題判定用の指標を記録
+                    metrics[len(metric_files)] = (
+                        width, height,
+                        quality_result['明度'], quality_result['コントラスト'],
+                        quality_result['ぼけスコア'], quality_result['ファイルサイズ'],
+                        quality_result['アスペクト比']
+                    )
+                    metric_files.append(image_file)
                     
                     # 詳細結果に追加
-                    results['詳細結果'].append({
-                        'ファイル名': image_file,
-                        **quality_result
-                    })
+                    if keep_details:
+                        results['詳細結果'].append({
+                            'ファイル名': image_file,
+                            **quality_result
+                        })
                 
                 else:
-                    results['品質問題']['読み込みエラー'].append({
+                    read_errors.append({
                         'ファイル名': image_file,
                         'エラー': quality_result['エラーメッセージ']
                     })
@@ -152,26 +236,141 @@ class ImageQualityChecker:
                 results['処理完了数'] = i + 1
                 
             except Exception as e:
-                results['品質問題']['読み込みエラー'].append({
+                read_errors.append({
                     'ファイル名': image_file,
                     'エラー': str(e)
                 })
         
+        # 問題のチェック（閾値判定は配列全体に対してまとめて行う）
+        problem_mask = self._categorize_quality_issues(
+            metrics[:len(metric_files)], metric_files, results['品質問題'], issue_counts, issue_cap
+        )
+        
+        issue_counts['読み込みエラー']['件数'] = len(read_errors)
+        results['品質問題']['読み込みエラー'] = read_errors if issue_cap is None else read_errors[:issue_cap]
+        results['問題画像数'] = int(np.count_nonzero(problem_mask)) + len(read_errors)
+        
         # 統計計算
         if valid_images > 0:
             results['品質統計']['平均解像度'] = {
                 'width': int(total_width / valid_images),
                 'height': int(total_height / valid_images)
             }
-            results['品質統計']['平均明度'] = round(total_brightness / valid_images, 1)
-            results['品質統計']['平均コントラスト'] = round(total_contrast / valid_images, 1)
+            results['品質統計']['平均明度'] = round(brightness_stats.mean, 1)
+            results['品質統計']['平均コントラスト'] = round(contrast_stats.mean, 1)
+            results['品質統計']['明度の標準偏差'] = round(brightness_stats.stddev, 1)
+            results['品質統計']['コントラストの標準偏差'] = round(contrast_stats.stddev, 1)
             results['品質統計']['平均ファイルサイズ'] = int(total_file_size / valid_images)
+            
+            # 分布（解像度の種類ごとにまとめて数える）
+            valid_metrics = metrics[:len(metric_files)]
+            resolution_dist, aspect_dist = self._count_distributions(valid_metrics['width'], valid_metrics['height'])
+            results['品質統計']['解像度分布'] = resolution_dist
+            results['品質統計']['アスペクト比分布'] = aspect_dist
         
         # 改善提案生成
-        results['推奨改善'] = self._generate_recommendations(results['品質問題'], results['品質統計'])
+        results['推奨改善'] = self._generate_recommendations(issue_counts, results['品質統計'])
         
         return results
     
+    @staticmethod
+    def _count_distributions(width: np.ndarray, height: np.ndarray) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        解像度分布・アスペクト比分布を集計
+        
+        (幅, 高さ) の組を np.unique でまとめて数え、アスペクト比は解像度の種類ごとに計算する
+        （キーは初出のファイル順）
+        """
+        
+        resolutions = np.stack([width, height], axis=1)
+        unique, first_index, counts = np.unique(resolutions, axis=0, return_index=True, return_counts=True)
+        order = np.argsort(first_index)
+        
+        resolution_dist = {}
+        aspect_dist = Counter()
+        for (w, h), count in zip(unique[order].tolist(), counts[order].tolist()):
+            resolution_dist[f"{w}x{h}"] = count
+            aspect_ratio = w / h if h > 0 else 0
+            aspect_dist[f"{aspect_ratio:.1f}:1"] += count
+        
+        return resolution_dist, dict(aspect_dist)
+    
+    def _check_images_cached(self, folder_path: str, image_files: List[str],
+                             image_paths: List[str], file_stats: List[Tuple[int, int]]) -> List[Dict]:
+        """
+        画像群の品質チェック（キャッシュ付き）
+        
+        ファイル名・更新時刻・サイズが前回と同じ画像はディスクキャッシュの結果を使い、
+        変更・追加された画像だけをチェックする
+        
+        Returns:
+            image_files と同じ順の品質チェック結果
+        """
+        cache_path = self._get_cache_path(folder_path) if self.use_cache else None
+        
+        cached = {}
+        if cache_path:
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                pass  # キャッシュなし・破損 → 全画像をチェック
+        
+        quality_results = [None] * len(image_files)
+        missing = []
+        for i, (image_file, (mtime_ns, size)) in enumerate(zip(image_files, file_stats)):
+            entry = cached.get(image_file)
+            if isinstance(entry, list) and len(entry) == 3 and entry[0] == mtime_ns and entry[1] == size:
+                quality_results[i] = entry[2]
+            else:
+                missing.append(i)
+        
+        if missing:
+            checked = self._check_images(
+                [image_paths[i] for i in missing],
+                [file_stats[i][1] for i in missing]
+            )
+            for i, quality_result in zip(missing, checked):
+                quality_results[i] = quality_result
+        
+        # 今あるファイルだけで保存し直す（削除された画像のエントリは落とす）
+        if cache_path and (missing or len(cached) != len(image_files)):
+            entries = {
+                image_file: [mtime_ns, size, quality_result]
+                for image_file, (mtime_ns, size), quality_result in zip(image_files, file_stats, quality_results)
+            }
+            try:
+                os.makedirs(self.CACHE_DIR, exist_ok=True)
+                tmp_path = cache_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass  # キャッシュ保存に失敗してもチェック結果はそのまま返す
+        
+        return quality_results
+    
+    def _get_cache_path(self, folder_path: str) -> str:
+        """フォルダの絶対パスからキャッシュファイルのパスを決定"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{self.CACHE_VERSION}\0{os.path.abspath(folder_path)}".encode('utf-8', 'surrogateescape'))
+        return os.path.join(self.CACHE_DIR, digest.hexdigest() + '.json')
+    
+    def _check_images(self, image_paths: List[str], file_sizes: List[int]) -> List[Dict]:
+        """画像群の品質チェック（大量ならプロセスプールで並列実行）"""
+        
+        workers = os.cpu_count() or 1
+        
+        if workers > 1 and len(image_paths) >= self.PARALLEL_MIN_IMAGES:
+            # IPCのオーバーヘッドを抑えるためまとめて渡す
+            chunksize = max(8, len(image_paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(check_single_image, image_paths, file_sizes, chunksize=chunksize))
+        
+        # 少量ならスレッドでファイル読み込みとデコードを重ねる
+        with ThreadPoolExecutor(max_workers=self.IO_THREADS) as executor:
+            return list(executor.map(check_single_image, image_paths, file_sizes))
+    
     def check_single_image(self, image_path: str) -> Dict:
         """
         単一画像の品質チェック
@@ -182,175 +381,155 @@ class ImageQualityChecker:
         Returns:
             品質チェック結果
         """
+        return check_single_image(image_path)
+    
+    def _categorize_quality_issues(self, metrics: np.ndarray, filenames: List[str], issues: Dict,
+                                   issue_counts: Dict, cap: Optional[int]) -> np.ndarray:
+        """
+        品質問題の分類（全画像の指標をまとめて閾値判定）
         
-        try:
-            # 基本情報取得
-            file_size = os.path.getsize(image_path)
-            
-            # PIL で画像読み込み
-            with Image.open(image_path) as pil_img:
-                width, height = pil_img.size
-                mode = pil_img.mode
-                
-                # RGB変換（統計計算用）
-                if mode != 'RGB':
-                    rgb_img = pil_img.convert('RGB')
-                else:
-                    rgb_img = pil_img
-                
-                # 明度・コントラスト計算
-                stat = ImageStat.Stat(rgb_img)
-                brightness = sum(stat.mean) / len(stat.mean)  # RGB平均
-                contrast = sum(stat.stddev) / len(stat.stddev)  # 標準偏差平均
-            
-            # OpenCV でぼけ検出
-            cv_img = cv2.imread(image_path)
-            if cv_img is not None:
-                gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
-                blur_score = cv2.Laplacian(gray, cv2.CV_64F).var()
-            else:
-                blur_score = 0
-            
-            # アスペクト比計算
-            aspect_ratio = width / height if height > 0 else 0
-            
-            return {
-                'エラー': False,
-                '解像度': {'width': width, 'height': height},
-                'ファイルサイズ': file_size,
-                '明度': round(brightness, 1),
-                'コントラスト': round(contrast, 1),
-                'ぼけスコア': round(blur_score, 1),
-                'アスペクト比': round(aspect_ratio, 2),
-                'フォーマット': mode,
-                'ファイルパス': image_path
-            }
+        Args:
+            metrics: 画像ごとの指標（_METRICS_DTYPE の構造化配列）
+            filenames: metrics と同じ順のファイル名
+            issues: 問題種別ごとの問題リスト（ファイル順に追加）
+            issue_counts: 問題種別ごとの件数・高重要度件数（加算）
+            cap: 問題リストに保持する最大件数（None なら全件）
             
-        except Exception as e:
-            return {
-                'エラー': True,
-                'エラーメッセージ': str(e),
-                'ファイルパス': image_path
-            }
-    
-    def _categorize_quality_issues(self, quality_result: Dict, issues: Dict, filename: str):
-        """品質問題の分類"""
+        Returns:
+            いずれかの問題がある画像のマスク
+        """
         
         thresholds = self.quality_thresholds
+        width, height = metrics['width'], metrics['height']
+        brightness, contrast = metrics['brightness'], metrics['contrast']
+        blur_score, file_size = metrics['blur'], metrics['file_size']
+        aspect_ratio = metrics['aspect_ratio']
+        problem_mask = np.zeros(len(metrics), dtype=bool)
+        
+        def add_issues(issue_type, mask, high_mask, make_issue):
+            nonlocal problem_mask
+            problem_mask |= mask
+            
+            indices = np.flatnonzero(mask)
+            counts = issue_counts[issue_type]
+            counts['件数'] += len(indices)
+            if high_mask is not None:
+                counts['高重要度'] += int(np.count_nonzero(mask & high_mask))
+            
+            # 問題リストに載せる分だけ辞書を作る
+            stored = issues[issue_type]
+            if cap is not None:
+                indices = indices[:max(0, cap - len(stored))]
+            stored.extend(make_issue(i) for i in indices.tolist())
         
         # 解像度チェック
-        width, height = quality_result['解像度']['width'], quality_result['解像度']['height']
-        if width < thresholds['min_width'] or height < thresholds['min_height']:
-            issues['解像度不足'].append({
-                'ファイル名': filename,
-                '現在の解像度': f"{width}x{height}",
+        add_issues(
+            '解像度不足',
+            (width < thresholds['min_width']) | (height < thresholds['min_height']),
+            (width < 224) | (height < 224),
+            lambda i: {
+                'ファイル名': filenames[i],
+                '現在の解像度': f"{width[i]}x{height[i]}",
                 '推奨解像度': f"{thresholds['recommended_width']}x{thresholds['recommended_height']}以上",
-                '重要度': 'high' if width < 224 or height < 224 else 'medium'
-            })
+                '重要度': 'high' if width[i] < 224 or height[i] < 224 else 'medium'
+            }
+        )
         
         # 明度チェック
-        brightness = quality_result['明度']
-        if brightness < thresholds['brightness_min']:
-            issues['明度問題'].append({
-                'ファイル名': filename,
-                '問題': '暗すぎる',
-                '明度値': brightness,
+        too_dark = brightness < thresholds['brightness_min']
+        too_bright = brightness > thresholds['brightness_max']
+        add_issues(
+            '明度問題',
+            too_dark | too_bright,
+            (too_dark & (brightness < 20)) | (too_bright & (brightness > 240)),
+            lambda i: {
+                'ファイル名': filenames[i],
+                '問題': '暗すぎる' if too_dark[i] else '明るすぎる',
+                '明度値': float(brightness[i]),
                 '推奨範囲': f"{thresholds['brightness_optimal_min']}-{thresholds['brightness_optimal_max']}",
-                '重要度': 'high' if brightness < 20 else 'medium'
-            })
-        elif brightness > thresholds['brightness_max']:
-            issues['明度問題'].append({
-                'ファイル名': filename,
-                '問題': '明るすぎる',
-                '明度値': brightness,
-                '推奨範囲': f"{thresholds['brightness_optimal_min']}-{thresholds['brightness_optimal_max']}",
-                '重要度': 'high' if brightness > 240 else 'medium'
-            })
+                '重要度': 'high' if (brightness[i] < 20 if too_dark[i] else brightness[i] > 240) else 'medium'
+            }
+        )
         
         # コントラストチェック
-        contrast = quality_result['コントラスト']
-        if contrast < thresholds['contrast_min']:
-            issues['コントラスト不足'].append({
-                'ファイル名': filename,
-                'コントラスト値': contrast,
+        add_issues(
+            'コントラスト不足',
+            contrast < thresholds['contrast_min'],
+            contrast < 10,
+            lambda i: {
+                'ファイル名': filenames[i],
+                'コントラスト値': float(contrast[i]),
                 '推奨値': f"{thresholds['contrast_optimal']}以上",
-                '重要度': 'high' if contrast < 10 else 'medium'
-            })
+                '重要度': 'high' if contrast[i] < 10 else 'medium'
+            }
+        )
         
         # ぼけチェック
-        blur_score = quality_result['ぼけスコア']
-        if blur_score < thresholds['blur_threshold']:
-            issues['ぼけ画像'].append({
-                'ファイル名': filename,
-                'ぼけスコア': blur_score,
+        add_issues(
+            'ぼけ画像',
+            blur_score < thresholds['blur_threshold'],
+            blur_score < 50,
+            lambda i: {
+                'ファイル名': filenames[i],
+                'ぼけスコア': float(blur_score[i]),
                 '推奨値': f"{thresholds['blur_warning']}以上",
-                '重要度': 'high' if blur_score < 50 else 'medium'
-            })
+                '重要度': 'high' if blur_score[i] < 50 else 'medium'
+            }
+        )
         
         # ファイルサイズチェック
-        file_size = quality_result['ファイルサイズ']
-        if file_size < thresholds['file_size_min']:
-            issues['ファイルサイズ異常'].append({
-                'ファイル名': filename,
+        too_small = file_size < thresholds['file_size_min']
+        too_large = file_size > thresholds['file_size_max']
+        add_issues(
+            'ファイルサイズ異常',
+            too_small | too_large,
+            None,
+            lambda i: {
+                'ファイル名': filenames[i],
                 '問題': 'ファイルサイズが小さすぎる',
-                'サイズ': f"{file_size / 1024:.1f}KB",
+                'サイズ': f"{file_size[i] / 1024:.1f}KB",
                 '重要度': 'medium'
-            })
-        elif file_size > thresholds['file_size_max']:
-            issues['ファイルサイズ異常'].append({
-                'ファイル名': filename,
+            } if too_small[i] else {
+                'ファイル名': filenames[i],
                 '問題': 'ファイルサイズが大きすぎる',
-                'サイズ': f"{file_size / (1024*1024):.1f}MB",
+                'サイズ': f"{file_size[i] / (1024*1024):.1f}MB",
                 '重要度': 'low'
-            })
+            }
+        )
         
         # アスペクト比チェック
-        aspect_ratio = quality_result['アスペクト比']
-        if aspect_ratio < thresholds['aspect_ratio_min'] or aspect_ratio > thresholds['aspect_ratio_max']:
-            issues['アスペクト比異常'].append({
-                'ファイル名': filename,
-                'アスペクト比': f"{aspect_ratio:.2f}:1",
+        add_issues(
+            'アスペクト比異常',
+            (aspect_ratio < thresholds['aspect_ratio_min']) | (aspect_ratio > thresholds['aspect_ratio_max']),
+            None,
+            lambda i: {
+                'ファイル名': filenames[i],
+                'アスペクト比': f"{aspect_ratio[i]:.2f}:1",
                 '推奨範囲': f"{thresholds['aspect_ratio_min']}-{thresholds['aspect_ratio_max']}:1",
                 '重要度': 'low'
-            })
+            }
+        )
+        
+        return problem_mask
     
-    def _generate_recommendations(self, issues: Dict, stats: Dict) -> List[str]:
-        """改善提案を生成"""
+    def _generate_recommendations(self, issue_counts: Dict, stats: Dict) -> List[str]:
+        """改善提案を生成（issue_counts: 問題種別ごとの件数）"""
         
         recommendations = []
-        total_issues = sum(len(issue_list) for issue_list in issues.values())
+        counts = {issue_type: c['件数'] for issue_type, c in issue_counts.items()}
+        total_issues = sum(counts.values())
         
         if total_issues == 0:
             recommendations.append("🎉 品質チェック完了！問題のある画像は見つかりませんでした。")
             return recommendations
         
         # 優先度の高い問題から提案
-        if issues['解像度不足']:
-            count = len(issues['解像度不足'])
-            recommendations.append(f"📐 解像度不足の画像が{count}枚あります。リサイズまたは再撮影を検討してください。")
-        
-        if issues['ぼけ画像']:
-            count = len(issues['ぼけ画像'])
-            recommendations.append(f"🌫️ ぼけている画像が{count}枚あります。ピントが合った画像に差し替えることをお勧めします。")
-        
-        if issues['明度問題']:
-            count = len(issues['明度問題'])
-            recommendations.append(f"💡 明度に問題のある画像が{count}枚あります。露出補正や照明調整を検討してください。")
-        
-        if issues['コントラスト不足']:
-            count = len(issues['コントラスト不足'])
-            recommendations.append(f"🎨 コントラストが低い画像が{count}枚あります。画像編集でコントラストを上げてください。")
-        
-        if issues['ファイルサイズ異常']:
-            count = len(issues['ファイルサイズ異常'])
-            recommendations.append(f"📁 ファイルサイズに問題のある画像が{count}枚あります。適切な品質設定で保存し直してください。")
-        
-        if issues['読み込みエラー']:
-            count = len(issues['読み込みエラー'])
-            recommendations.append(f"❌ 読み込みエラーの画像が{count}枚あります。ファイルが破損している可能性があります。")
+        for issue_type, template in self.RECOMMENDATION_TEMPLATES:
+            if counts[issue_type]:
+                recommendations.append(template.format(count=counts[issue_type]))
         
         # 全体的な提案
-        if total_issues > len(issues.get('アスペクト比異常', [])):  # アスペクト比以外の問題がある場合
+        if total_issues > counts.get('アスペクト比異常', 0):  # アスペクト比以外の問題がある場合
             recommendations.append("🔧 品質改善後、再度チェックを実行して確認することをお勧めします。")
         
         return recommendations
@@ -364,16 +543,20 @@ class ImageQualityChecker:
         total_images = quality_result['総画像数']
         issues = quality_result['品質問題']
         
-        # 問題の総数計算
-        total_issues = sum(len(issue_list) for issue_list in issues.values())
-        problem_images = set()
-        
-        for issue_list in issues.values():
-            for issue in issue_list:
-                if isinstance(issue, dict) and 'ファイル名' in issue:
-                    problem_images.add(issue['ファイル名'])
+        if '品質問題件数' in quality_result:
+            # チェック時に数えた件数（問題リストは間引かれている場合がある）
+            issue_counts = quality_result['品質問題件数']
+            problem_count = quality_result['問題画像数']
+        else:
+            # 件数を持たない古い形式の結果は問題リストから数える
+            issue_counts = self._count_issues(issues)
+            problem_count = len({
+                issue['ファイル名']
+                for issue_list in issues.values()
+                for issue in issue_list
+                if isinstance(issue, dict) and 'ファイル名' in issue
+            })
         
-        problem_count = len(problem_images)
         healthy_count = total_images - problem_count
         
         # 品質スコア計算（0-100）
@@ -385,22 +568,33 @@ class ImageQualityChecker:
             '総画像数': total_images,
             '健全画像数': healthy_count,
             '問題画像数': problem_count,
-            '主要問題': self._get_major_issues(issues),
+            '主要問題': self._get_major_issues(issue_counts),
             '状態': self._get_quality_status(quality_score),
             '推奨アクション': quality_result['推奨改善'][:3]  # 上位3つ
         }
     
-    def _get_major_issues(self, issues: Dict) -> List[Dict]:
-        """主要な問題を抽出"""
+    @staticmethod
+    def _count_issues(issues: Dict) -> Dict:
+        """問題リストから問題種別ごとの件数・高重要度件数を数える"""
+        
+        return {
+            issue_type: {
+                '件数': len(issue_list),
+                '高重要度': sum(1 for issue in issue_list if issue.get('重要度') == 'high')
+            }
+            for issue_type, issue_list in issues.items()
+        }
+    
+    def _get_major_issues(self, issue_counts: Dict) -> List[Dict]:
+        """主要な問題を抽出（issue_counts: 問題種別ごとの件数・高重要度件数）"""
         
         major_issues = []
         
-        for issue_type, issue_list in issues.items():
-            if issue_list:
+        for issue_type, counts in issue_counts.items():
+            if counts['件数']:
                 # 重要度の高い問題を優先
-                high_priority = [issue for issue in issue_list if issue.get('重要度') == 'high']
-                count = len(issue_list)
-                priority_count = len(high_priority)
+                count = counts['件数']
+                priority_count = counts['高重要度']
                 
                 major_issues.append({
                     '問題種別': issue_type,
@@ -414,25 +608,180 @@ class ImageQualityChecker:
         
         return major_issues[:5]  # 上位5つ
     
-    def _get_quality_status(self, score: int) -> str:
+    @classmethod
+    def _get_quality_status(cls, score: int) -> str:
         """品質スコアから状態を判定"""
         
-        if score >= 90:
-            return "🟢 優秀"
-        elif score >= 75:
-            return "🟡 良好"
-        elif score >= 60:
-            return "🟠 改善推奨"
-        else:
-            return "🔴 要改善"
+        return cls.QUALITY_STATUS_LABELS[bisect_right(cls.QUALITY_STATUS_SCORES, score)]
+    
+    def serialize_quality_report(self, quality_result: Dict) -> bytes:
+        """品質チェックレポートをJSON（UTF-8のバイト列）に変換"""
+        if orjson is not None:
+            # C実装で bytes を直接生成（UTF-8 のまま出力される。NumPy の値も変換なしで書き出せる）
+            return orjson.dumps(
+                quality_result,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        
+        return json.dumps(quality_result, ensure_ascii=False, indent=2).encode('utf-8')
     
     def export_quality_report(self, quality_result: Dict, output_path: str):
         """品質チェックレポートをJSON形式でエクスポート"""
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(quality_result, f, ensure_ascii=False, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(self.serialize_quality_report(quality_result))
             return True
         except Exception as e:
             print(f"レポート出力エラー: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+def check_single_image(image_path: str, file_size: Optional[int] = None) -> Dict:
+    """
+    単一画像の品質チェック（プロセスプールから呼べるようモジュール関数にしている）
+    
+    Args:
+        image_path: 画像ファイルパス
+        file_size: 取得済みのファイルサイズ（省略時はここで取得）
+        
+    Returns:
+        品質チェック結果
+    """
+    
+    try:
+        # ファイルは1回だけ読み込み、ヘッダー解析もデコードもメモリ上で行う
+        # （cv2.imread は Windows で日本語を含むパスを開けないため、Pythonで読んで imdecode に渡す）
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        
+        # 基本情報取得（一覧取得時のサイズがあればそれを使う）
+        if file_size is None:
+            file_size = len(data)
+        
+        # 空ファイルはデコードするまでもなく壊れている
+        if not data:
+            return {
+                'エラー': True,
+                'エラーメッセージ': 'ファイルが空です',
+                'ファイルパス': image_path
+            }
+        
+        # 先頭バイトで形式を判定し、対応外（SVG・GIF・壊れたファイル等）はデコードを試さない
+        if _sniff_format(data) is None:
+            return {
+                'エラー': True,
+                'エラーメッセージ': '対応していない画像形式です（JPEG/PNG/WebP/BMP/TIFF以外、または破損）',
+                'ファイルパス': image_path
+            }
+        
+        # 解像度・モードはヘッダーだけ読めば分かる（PILは遅延デコード、壊れたヘッダーはここで失敗する）
+        try:
+            pil_img = Image.open(io.BytesIO(data))
+        except UnidentifiedImageError:
+            raise UnidentifiedImageError(f"cannot identify image file {image_path!r}")
+        
+        with pil_img:
+            width, height = pil_img.size
+            mode = pil_img.mode
+            
+            # 画素のデコードは OpenCV で1回だけ（向き補正はPILのサイズと揃えるため無効化）
+            # ぼけスコアは原寸の画素が必要なので縮小デコードはしない
+            pixels = cv2.imdecode(
+                np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+            )
+            to_gray = cv2.COLOR_BGR2GRAY
+            if pixels is None:
+                # OpenCVで読めない形式だけPILでデコード
+                pixels = np.asarray(pil_img.convert('RGB'))
+                to_gray = cv2.COLOR_RGB2GRAY
+        
+        # 明度・コントラスト計算（チャンネルごとの平均・標準偏差をRGBで平均）
+        mean, stddev = cv2.meanStdDev(pixels)
+        brightness = float(mean.mean())
+        contrast = float(stddev.mean())
+        
+        # ぼけ検出
+        blur_score = _blur_score(cv2.cvtColor(pixels, to_gray))
+        
+        # アスペクト比計算
+        aspect_ratio = width / height if height > 0 else 0
+        
+        return {
+            'エラー': False,
+            '解像度': {'width': width, 'height': height},
+            'ファイルサイズ': file_size,
+            '明度': round(brightness, 1),
+            'コントラスト': round(contrast, 1),
+            'ぼけスコア': round(blur_score, 1),
+            'アスペクト比': round(aspect_ratio, 2),
+            'フォーマット': mode,
+            'ファイルパス': image_path
+        }
+        
+    except Exception as e:
+        return {
+            'エラー': True,
+            'エラーメッセージ': str(e),
+            'ファイルパス': image_path
+        }
+
+
+def _blur_score(gray: np.ndarray) -> float:
+    """
+    ぼけスコア（Laplacianの分散）を計算
+    
+    縮小はせず原寸の画素で計算する（縮小すると細かいぼけが見えなくなり、値も大きくなる）。
+    大きい画像は縦方向に等間隔の横帯だけを使う（全体の分散の推定値）
+    """
+    height, width = gray.shape[:2]
+    band = BLUR_SAMPLE_BAND
+    
+    # uint8 の Laplacian は -1020〜1020 に収まるので int16 で正確に保持できる
+    if height * width <= BLUR_SAMPLE_PIXELS or height < band * 4:
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+    else:
+        count = max(1, BLUR_SAMPLE_PIXELS // (band * width))
+        starts = np.linspace(1, height - band - 1, count).astype(int)
+        # 帯の上下1行も含めて計算し、画像端扱いにならない内側の行だけを使う
+        laplacian = np.concatenate([
+            cv2.Laplacian(gray[y - 1:y + band + 1], cv2.CV_16S)[1:-1]
+            for y in starts.tolist()
+        ])
+    
+    _, lap_stddev = cv2.meanStdDev(laplacian)
+    return float(lap_stddev[0, 0]) ** 2
+
+
+class _RunningStats:
+    """Welford 法による平均・標準偏差の逐次計算（値を保持しない）"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+    
+    @property
+    def stddev(self) -> float:
+        return (self._m2 / self.count) ** 0.5 if self.count > 0 else 0.0
+
+
+def _sniff_format(data: bytes) -> Optional[str]:
+    """ファイル先頭のマジックナンバーから画像形式を判定（対応外なら None）"""
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if data.startswith(b'\x89PNG'):
+        return 'PNG'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'WEBP'
+    if data.startswith(b'BM'):
+        return 'BMP'
+    if data.startswith((b'II*\x00', b'MM\x00*')):
+        return 'TIFF'
+    return None
@@ -4,12 +4,12 @@ Streamlit UI メイン画面
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from pathlib import Path
+from datetime import datetime
+import io
 import sys
 import os
+from typing import TYPE_CHECKING, Optional
 
 # パスを追加してモジュールをインポート
 current_dir = Path(__file__).parent
@@ -17,9 +17,23 @@ project_root = current_dir.parent
 sys.path.append(str(project_root))
 
 from analyzer.estimator import BeginnerFriendlyYOLOEstimator
-from utils.file_utils import validate_folder_structure, get_folder_summary
-from converter.yolo_converter import YOLOConverter
-from quality.image_quality_checker import ImageQualityChecker
+from utils.file_utils import validate_folder_structure, format_folder_summary
+
+# pandas・plotly・変換・品質チェック（OpenCV）は読み込みが重いので、使う関数の中でインポートする
+if TYPE_CHECKING:
+    import pandas as pd
+    from quality.image_quality_checker import ImageQualityChecker
+    from converter.yolo_converter import YOLOConverter
+
+
+# st.fragment は Streamlit 1.37 以降（1.33〜は experimental、それより古い版では通常の関数として動く）
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+# 画像サイズ選択肢の表示名（描画のたびに組み立てない）
+IMAGE_SIZE_LABELS = {320: "320x320 (高速)", 640: "640x640 (標準)", 1280: "1280x1280 (高精度)"}
+
+# グラフ表示の共通設定（Streamlitテーマの合成とツールバーを省いて描画を軽くする）
+PLOTLY_CHART_OPTIONS = {'use_container_width': True, 'theme': None, 'config': {'displayModeBar': False}}
 
 
 def main():
@@ -56,11 +70,11 @@ def show_analysis_tab():
         st.header("📊 分析設定")
         
         # フォルダ選択
-        folder_path = get_folder_input()
+        folder_path, validation = get_folder_input()
         
-        if folder_path and os.path.exists(folder_path):
-            # フォルダ概要表示
-            st.success(get_folder_summary(folder_path))
+        if folder_path and validation is not None:
+            # フォルダ概要表示（入力欄で検証した結果を使い、フォルダを再走査しない）
+            st.success(format_folder_summary(folder_path, validation))
             
             # 設定項目
             target_accuracy = st.selectbox(
@@ -72,9 +86,9 @@ def show_analysis_tab():
             
             image_size = st.selectbox(
                 "📏 画像サイズ",
-                [320, 640, 1280],
+                list(IMAGE_SIZE_LABELS),
                 index=1,
-                format_func=lambda x: f"{x}x{x} ({'高速' if x==320 else '標準' if x==640 else '高精度'})",
+                format_func=IMAGE_SIZE_LABELS.__getitem__,
                 help="640x640が標準的でバランスが良いです。"
             )
             
@@ -82,10 +96,23 @@ def show_analysis_tab():
             analyze_button = st.button("🔍 分析開始", type="primary", use_container_width=True)
         else:
             analyze_button = False
+            target_accuracy = image_size = None
     
     # メインエリア
     if analyze_button and folder_path:
         analyze_and_display(folder_path, target_accuracy, image_size)
+    elif folder_path and st.session_state.get('_analysis_key', ())[:3] == (folder_path, target_accuracy, image_size):
+        # 同じ条件・同じフォルダ内容で分析済みなら、他の操作による再実行でも前回の結果を表示し続ける
+        try:
+            fingerprint = BeginnerFriendlyYOLOEstimator.folder_fingerprint(folder_path)
+        except OSError:
+            fingerprint = None
+        
+        if st.session_state['_analysis_key'][3] == fingerprint:
+            display_analysis_results(st.session_state['_analysis_result'])
+        else:
+            st.info("📁 前回の分析後にフォルダの内容が変わりました。「🔍 分析開始」で分析し直してください")
+            show_welcome_page()
     else:
         show_welcome_page()
 
@@ -129,6 +156,13 @@ def show_conversion_tab():
             help="チェックを外すとラベルファイルのみ生成"
         )
         
+        link_images = st.checkbox(
+            "🔗 画像をハードリンクで配置",
+            value=False,
+            disabled=not copy_images,
+            help="入力と出力が同じドライブなら、コピーせずに一瞬で配置できます（容量も増えません）"
+        )
+        
         # 変換実行ボタン
         convert_button = st.button(
             "🚀 YOLO形式に変換", 
@@ -139,7 +173,7 @@ def show_conversion_tab():
     
     # メインエリア
     if convert_button and input_folder and output_folder:
-        perform_conversion(input_folder, output_folder, train_ratio, copy_images)
+        perform_conversion(input_folder, output_folder, train_ratio, copy_images, link_images)
     else:
         show_conversion_help()
 
@@ -198,64 +232,98 @@ def show_conversion_help():
     st.info("💡 左側のサイドバーで入力・出力フォルダを指定して「変換」ボタンを押してください")
 
 
-def perform_conversion(input_folder: str, output_folder: str, train_ratio: float, copy_images: bool):
+def _bullet_markdown(items: list, header: str = "") -> str:
+    """メッセージ一覧を箇条書きのMarkdownにまとめる（1件ずつ要素を作らず、1回の描画で表示する）"""
+    lines = "\n".join(f"- {item}" for item in items)
+    return f"{header}\n\n{lines}" if header else lines
+
+
+class _ThrottledProgress:
+    """
+    プログレスバーと状態メッセージの表示
+    
+    進捗（0〜100）が前回の表示から MIN_STEP 未満しか進んでいなければバーを更新しない
+    （細かい進捗を渡しても、ブラウザへ送る更新は数十回に収まる）
+    """
+    
+    MIN_STEP = 5
+    
+    def __init__(self):
+        self.bar = st.progress(0)
+        self.status = st.empty()
+        self.last_percent = 0
+    
+    def __call__(self, percent: int, message: Optional[str] = None):
+        if message is not None:
+            self.status.text(message)
+        
+        if percent - self.last_percent >= self.MIN_STEP:
+            self.bar.progress(percent)
+            self.last_percent = percent
+    
+    def clear(self):
+        self.bar.empty()
+        self.status.empty()
+
+
+def _numbered_markdown(items: list) -> str:
+    """手順の一覧を番号付きのMarkdownにまとめる（1件ずつ st.write しない）"""
+    return "\n\n".join(f"**{i}.** {item}" for i, item in enumerate(items, 1))
+
+
+def perform_conversion(input_folder: str, output_folder: str, train_ratio: float, copy_images: bool,
+                       link_images: bool = False):
     """YOLO変換を実行"""
     
     # プログレスバー
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    progress = _ThrottledProgress()
     
     try:
-        status_text.text("🔍 入力フォルダを検証中...")
-        progress_bar.progress(10)
+        progress(10, "🔍 入力フォルダを検証中...")
         
         # 入力フォルダ検証
-        validation = validate_folder_structure(input_folder)
+        validation = _cached_validate(input_folder, _dir_mtime(input_folder))
         if not validation['valid']:
-            st.error("❌ 入力フォルダに問題があります:")
-            for error in validation['errors']:
-                st.error(f"• {error}")
+            st.error(_bullet_markdown(validation['errors'], "❌ 入力フォルダに問題があります:"))
             return
         
-        status_text.text("🔄 変換処理を開始中...")
-        progress_bar.progress(25)
+        progress(25, "🔄 変換処理を開始中...")
         
         # 変換実行
-        converter = YOLOConverter()
+        converter = get_converter()
         
-        status_text.text("📁 ファイルを変換中...")
-        progress_bar.progress(50)
+        progress(30, "📁 ファイルを変換中...")
+        
+        # 変換済みペア数に応じて 30〜75% の範囲でバーを進める
+        def on_pair_done(done: int, total: int):
+            progress(30 + 45 * done // total)
         
         result = converter.convert_dataset(
             input_folder=input_folder,
             output_folder=output_folder,
             train_ratio=train_ratio,
-            copy_images=copy_images
+            copy_images=copy_images,
+            link_images=link_images,
+            progress_callback=on_pair_done
         )
         
-        status_text.text("📊 結果を表示中...")
-        progress_bar.progress(75)
+        progress(75, "📊 結果を表示中...")
         
         # 結果表示
         display_conversion_results(result)
         
-        progress_bar.progress(100)
-        status_text.text("✅ 変換完了！")
-        
-        # 少し待ってからクリア
-        import time
-        time.sleep(2)
-        progress_bar.empty()
-        status_text.empty()
+        # 完了通知はトースト（待たずにスクリプトを終える）
+        progress.clear()
+        st.toast("✅ 変換完了！")
         
     except Exception as e:
         st.error(f"❌ 変換中にエラーが発生しました: {str(e)}")
-        progress_bar.empty()
-        status_text.empty()
+        progress.clear()
 
 
 def display_conversion_results(result: dict):
     """変換結果の表示"""
+    import pandas as pd
     
     if result['変換成功']:
         st.success("🎉 YOLO形式への変換が完了しました！")
@@ -278,19 +346,14 @@ def display_conversion_results(result: dict):
         
         # クラス分布
         st.subheader("🎯 クラス分布")
-        class_df = pd.DataFrame(
-            list(result['クラス情報'].items()),
-            columns=['クラス名', 'アノテーション数']
-        )
+        class_df = pd.DataFrame({
+            'クラス名': list(result['クラス情報'].keys()),
+            'アノテーション数': list(result['クラス情報'].values())
+        })
         
         # 棒グラフ
-        fig = px.bar(
-            class_df,
-            x='クラス名',
-            y='アノテーション数',
-            title="クラス別アノテーション数"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        fig = _make_annotation_bar_fig(class_df)
+        st.plotly_chart(fig, **PLOTLY_CHART_OPTIONS)
         
         # データフレーム表示
         st.dataframe(class_df, use_container_width=True, hide_index=True)
@@ -322,46 +385,69 @@ def display_conversion_results(result: dict):
         
         # エラー・警告
         if result['エラー']:
-            st.warning("⚠️ 変換中に以下の問題が発生しました:")
-            for error in result['エラー']:
-                st.warning(f"• {error}")
+            st.warning(_bullet_markdown(result['エラー'], "⚠️ 変換中に以下の問題が発生しました:"))
         
         # 検証実行
         st.subheader("✅ データセット検証")
-        if st.button("🔍 変換結果を検証"):
-            converter = YOLOConverter()
-            validation = converter.validate_yolo_dataset(result['出力フォルダ'])
-            
-            if validation['valid']:
-                st.success("✅ データセットは正常です")
-                
-                # 統計表示
-                val_stats = validation['statistics']
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("訓練画像", val_stats['訓練画像数'])
-                with col2:
-                    st.metric("検証画像", val_stats['検証画像数'])
-                with col3:
-                    st.metric("訓練ラベル", val_stats['訓練ラベル数'])
-                with col4:
-                    st.metric("検証ラベル", val_stats['検証ラベル数'])
-                
-            else:
-                st.error("❌ データセットに問題があります:")
-                for error in validation['errors']:
-                    st.error(f"• {error}")
-            
-            # 警告表示
-            for warning in validation['warnings']:
-                st.warning(f"⚠️ {warning}")
+        _validation_fragment(result['出力フォルダ'])
     
     else:
-        st.error("❌ 変換に失敗しました")
-        if 'エラー' in result:
-            for error in result['エラー']:
-                st.error(f"• {error}")
+        st.error(_bullet_markdown(result.get('エラー', []), "❌ 変換に失敗しました"))
+
+
+@st.cache_resource
+def get_converter() -> 'YOLOConverter':
+    """変換器（変換ごとの状態を持たないので、変換・検証ともセッションをまたいで共有）"""
+    from converter.yolo_converter import YOLOConverter
+    return YOLOConverter()
+
+
+def _yolo_dataset_version(yolo_folder: str) -> tuple:
+    """YOLOデータセットのバージョンキー（ルートと images/labels 各フォルダの更新時刻）"""
+    return tuple(
+        _dir_mtime(os.path.join(yolo_folder, item))
+        for item in ('', 'images/train', 'images/val', 'labels/train', 'labels/val')
+    )
+
+
+@st.cache_data(ttl=30, max_entries=16, show_spinner=False)
+def _cached_yolo_validate(yolo_folder: str, dataset_version: tuple) -> dict:
+    """
+    YOLOデータセットの検証（ボタンを押し直しても再度フォルダを数えない）
+    
+    dataset_version はキャッシュキーとしてのみ使用（ファイルの追加・削除で再検証される）
+    """
+    return get_converter().validate_yolo_dataset(yolo_folder)
+
+
+@_fragment
+def _validation_fragment(output_folder: str):
+    """変換結果の検証UI（ボタンを押してもこの部分だけ再実行される）"""
+    if st.button("🔍 変換結果を検証"):
+        validation = _cached_yolo_validate(output_folder, _yolo_dataset_version(output_folder))
+        
+        if validation['valid']:
+            st.success("✅ データセットは正常です")
+            
+            # 統計表示
+            val_stats = validation['statistics']
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("訓練画像", val_stats['訓練画像数'])
+            with col2:
+                st.metric("検証画像", val_stats['検証画像数'])
+            with col3:
+                st.metric("訓練ラベル", val_stats['訓練ラベル数'])
+            with col4:
+                st.metric("検証ラベル", val_stats['検証ラベル数'])
+            
+        else:
+            st.error(_bullet_markdown(validation['errors'], "❌ データセットに問題があります:"))
+        
+        # 警告表示
+        if validation['warnings']:
+            st.warning(_bullet_markdown(validation['warnings'], "⚠️ 警告:"))
 
 
 def show_quality_check_tab():
@@ -462,29 +548,35 @@ def show_quality_check_help():
     st.info("💡 左側のサイドバーで画像フォルダを指定して「品質チェック実行」ボタンを押してください")
 
 
+def get_quality_checker() -> 'ImageQualityChecker':
+    """品質チェッカー（しきい値は利用者ごとに変わるので、セッション単位で使い回す）"""
+    if '_quality_checker' not in st.session_state:
+        from quality.image_quality_checker import ImageQualityChecker
+        st.session_state['_quality_checker'] = ImageQualityChecker()
+    
+    return st.session_state['_quality_checker']
+
+
 def perform_quality_check(folder_path: str, settings: dict):
     """品質チェックを実行"""
     
     # プログレスバー
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    progress = _ThrottledProgress()
     
     try:
-        status_text.text("🔍 フォルダを検証中...")
-        progress_bar.progress(10)
+        progress(10, "🔍 フォルダを検証中...")
         
         # フォルダ検証
         if not os.path.exists(folder_path):
             st.error(f"❌ フォルダが見つかりません: {folder_path}")
             return
         
-        status_text.text("🖼️ 画像品質をチェック中...")
-        progress_bar.progress(25)
+        progress(25, "🖼️ 画像品質をチェック中...")
         
         # 品質チェック実行
-        checker = ImageQualityChecker()
+        checker = get_quality_checker()
         
-        # 設定を反映（簡易版）
+        # 設定を反映（簡易版。セッションの checker をその場で更新する）
         if 'min_resolution' in settings:
             checker.quality_thresholds['min_width'] = settings['min_resolution']
             checker.quality_thresholds['min_height'] = settings['min_resolution']
@@ -492,34 +584,28 @@ def perform_quality_check(folder_path: str, settings: dict):
         if 'blur_threshold' in settings:
             checker.quality_thresholds['blur_threshold'] = settings['blur_threshold']
         
-        status_text.text("📊 品質分析中...")
-        progress_bar.progress(50)
+        progress(50, "📊 品質分析中...")
         
         quality_result = checker.check_dataset_quality(folder_path)
+        _report_timestamp('quality', new=True)
         
-        status_text.text("📈 結果を表示中...")
-        progress_bar.progress(75)
+        progress(75, "📈 結果を表示中...")
         
         # 結果表示
         display_quality_results(quality_result, checker)
         
-        progress_bar.progress(100)
-        status_text.text("✅ 品質チェック完了！")
-        
-        # 少し待ってからクリア
-        import time
-        time.sleep(2)
-        progress_bar.empty()
-        status_text.empty()
+        # 完了通知はトースト（待たずにスクリプトを終える）
+        progress.clear()
+        st.toast("✅ 品質チェック完了！")
         
     except Exception as e:
         st.error(f"❌ 品質チェック中にエラーが発生しました: {str(e)}")
-        progress_bar.empty()
-        status_text.empty()
+        progress.clear()
 
 
-def display_quality_results(quality_result: dict, checker: ImageQualityChecker):
+def display_quality_results(quality_result: dict, checker: 'ImageQualityChecker'):
     """品質チェック結果の表示"""
+    import pandas as pd
     
     if quality_result.get('エラー', False):
         st.error(f"❌ {quality_result['メッセージ']}")
@@ -583,20 +669,24 @@ def display_quality_results(quality_result: dict, checker: ImageQualityChecker):
                 if issue['問題種別'] in quality_result['品質問題']:
                     problems = quality_result['品質問題'][issue['問題種別']]
                     
-                    # 最初の5件を表示
-                    for i, problem in enumerate(problems[:5]):
-                        if isinstance(problem, dict) and 'ファイル名' in problem:
-                            st.write(f"• {problem['ファイル名']}")
+                    # 最初の5件を1回の描画で表示
+                    file_names = [
+                        problem['ファイル名'] for problem in problems[:5]
+                        if isinstance(problem, dict) and 'ファイル名' in problem
+                    ]
+                    
+                    # 大規模データセットでは問題リストが間引かれるので件数はサマリーから
+                    if issue['件数'] > 5:
+                        file_names.append(f"... 他 {issue['件数'] - 5} 件")
                     
-                    if len(problems) > 5:
-                        st.write(f"... 他 {len(problems) - 5} 件")
+                    if file_names:
+                        st.markdown(_bullet_markdown(file_names))
     
     # 改善提案
     if summary['推奨アクション']:
         st.header("💡 改善提案")
         
-        for i, action in enumerate(summary['推奨アクション'], 1):
-            st.write(f"**{i}.** {action}")
+        st.markdown(_numbered_markdown(summary['推奨アクション']))
     
     # 統計情報
     st.header("📈 統計情報")
@@ -622,63 +712,91 @@ def display_quality_results(quality_result: dict, checker: ImageQualityChecker):
     if stats['解像度分布']:
         st.subheader("📐 解像度分布")
         
-        resolution_data = []
-        for resolution, count in stats['解像度分布'].items():
-            resolution_data.append({'解像度': resolution, '画像数': count})
-        
-        resolution_df = pd.DataFrame(resolution_data)
+        resolution_df = pd.DataFrame({
+            '解像度': list(stats['解像度分布'].keys()),
+            '画像数': list(stats['解像度分布'].values())
+        })
         
         # 棒グラフ
-        fig = px.bar(
-            resolution_df,
-            x='解像度',
-            y='画像数',
-            title="解像度別画像数"
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = _make_resolution_bar_fig(resolution_df)
+        st.plotly_chart(fig, **PLOTLY_CHART_OPTIONS)
     
     # 詳細結果のダウンロード
     st.header("📄 レポート出力")
     
-    # JSON形式
-    json_data = json.dumps(quality_result, ensure_ascii=False, indent=2)
+    # JSON形式（文字列を経由せず、UTF-8のバイト列を直接生成）
+    json_data = checker.serialize_quality_report(quality_result)
     st.download_button(
         label="📊 詳細レポート (JSON形式)",
         data=json_data,
-        file_name=f"quality_report_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json",
+        file_name=f"quality_report_{_report_timestamp('quality')}.json",
         mime='application/json',
         help="詳細な品質チェック結果をJSON形式でダウンロードします"
     )
     
     # CSV形式（問題画像一覧）
     if any(quality_result['品質問題'].values()):
-        problem_data = []
+        # 列ごとのリストに集めてから一度に DataFrame を作る（行ごとの dict は作らない）
+        problem_data = {'問題種別': [], 'ファイル名': [], '重要度': [], '詳細': []}
         for issue_type, issues in quality_result['品質問題'].items():
-            for issue in issues:
-                if isinstance(issue, dict) and 'ファイル名' in issue:
-                    problem_data.append({
-                        '問題種別': issue_type,
-                        'ファイル名': issue['ファイル名'],
-                        '重要度': issue.get('重要度', '不明'),
-                        '詳細': str(issue)
-                    })
-        
-        if problem_data:
+            valid_issues = [issue for issue in issues if isinstance(issue, dict) and 'ファイル名' in issue]
+            problem_data['問題種別'].extend([issue_type] * len(valid_issues))
+            problem_data['ファイル名'].extend([issue['ファイル名'] for issue in valid_issues])
+            problem_data['重要度'].extend([issue.get('重要度', '不明') for issue in valid_issues])
+            problem_data['詳細'].extend(map(str, valid_issues))
+        
+        if problem_data['ファイル名']:
             problem_df = pd.DataFrame(problem_data)
-            csv_data = problem_df.to_csv(index=False, encoding='utf-8-sig')
+            csv_buffer = io.BytesIO()
+            problem_df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
+            csv_data = csv_buffer.getvalue()
             
             st.download_button(
                 label="⚠️ 問題画像一覧 (CSV形式)",
                 data=csv_data,
-                file_name=f"problem_images_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                file_name=f"problem_images_{_report_timestamp('quality')}.csv",
                 mime='text/csv',
                 help="問題のある画像の一覧をCSV形式でダウンロードします"
             )
 
 
-def get_folder_input():
-    """フォルダ入力UI"""
+def _report_timestamp(kind: str, new: bool = False) -> str:
+    """
+    レポートのファイル名に付ける時刻
+    
+    結果を作った時点（new=True）で固定してセッションに保存し、再実行のたびに変えない
+    """
+    key = f'{kind}_report_timestamp'
+    if new or key not in st.session_state:
+        st.session_state[key] = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return st.session_state[key]
+
+
+def _dir_mtime(folder_path: str) -> Optional[int]:
+    """フォルダ自体の更新時刻（ファイルの追加・削除・名前変更で変わる。無ければ None）"""
+    try:
+        return os.stat(folder_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def _cached_validate(folder_path: str, mtime: Optional[int]) -> dict:
+    """
+    フォルダ構造の検証（再実行のたびにフォルダを読み直さない）
+    
+    mtime はキャッシュキーとしてのみ使用（フォルダの中身が変わると再検証される）
+    """
+    return validate_folder_structure(folder_path)
+
+
+def get_folder_input() -> tuple:
+    """
+    フォルダ入力UI
+    
+    Returns:
+        (フォルダパス, フォルダ構造の検証結果)（未入力・フォルダでない場合は (None, None)）
+    """
     
     # タブで入力方法を切り替え
     tab1, tab2 = st.tabs(["📁 パス入力", "💡 ヘルプ"])
@@ -705,20 +823,31 @@ def get_folder_input():
             help="画像ファイル(.jpg, .png等)とlabelmeのJSONファイルが入っているフォルダのパスを入力してください"
         )
         
+        # 検証結果はフォルダの更新時刻でキャッシュしているので、明示的に読み直す手段を用意
+        if st.button("🔄 フォルダを再読み込み", help="フォルダの中身を読み直して検証し直します"):
+            _cached_validate.clear()
+        
         # パス検証
         if folder_path:
-            validation = validate_folder_structure(folder_path)
+            # 入力途中のパスなどフォルダでなければ、中身の走査もキャッシュ登録もせずに終える
+            if not os.path.isdir(folder_path):
+                st.error(f"❌ フォルダが見つかりません: {folder_path}")
+                return None, None
+            
+            validation = _cached_validate(folder_path, _dir_mtime(folder_path))
             
             if validation['valid']:
                 st.success(f"✅ フォルダが見つかりました")
-                return folder_path
+                return folder_path, validation
             else:
-                for error in validation['errors']:
-                    st.error(f"❌ {error}")
-                for warning in validation['warnings']:
-                    st.warning(f"⚠️ {warning}")
+                if validation['errors']:
+                    st.error(_bullet_markdown(validation['errors'], "❌ フォルダに問題があります:"))
+                if validation['warnings']:
+                    st.warning(_bullet_markdown(validation['warnings'], "⚠️ 注意事項:"))
+            
+            return folder_path, validation
         
-        return folder_path if folder_path else None
+        return None, None
     
     with tab2:
         st.subheader("💡 フォルダの準備方法")
@@ -774,29 +903,49 @@ def show_welcome_page():
         st.info("💡 初めての方は「ヘルプ」タブでフォルダの準備方法を確認してください")
 
 
+@st.cache_resource
+def get_estimator() -> BeginnerFriendlyYOLOEstimator:
+    """推定器（状態を持たないのでセッションをまたいで共有）"""
+    return BeginnerFriendlyYOLOEstimator()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_folder_scan(folder_path: str, fingerprint: str) -> tuple:
+    """
+    フォルダ分析とクラス集計（同じフォルダ内容なら再計算しない）
+    
+    fingerprint はフォルダ内容の指紋（フォルダが変わると再計算される）。
+    目標精度・画像サイズに依存しないので、設定を変えてもJSONは読み直さない
+    """
+    return get_estimator().analyze_folder_and_classes(folder_path, fingerprint)
+
+
 def analyze_and_display(folder_path: str, target_accuracy: str, image_size: int):
     """分析実行・結果表示"""
     
     # プログレスバー
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    progress = _ThrottledProgress()
     
     try:
         # 分析実行
-        status_text.text("📁 フォルダを読み込み中...")
-        progress_bar.progress(25)
+        progress(25, "📁 フォルダを読み込み中...")
         
-        estimator = BeginnerFriendlyYOLOEstimator()
+        # フォルダ内容の指紋（推定器のディスクキャッシュと共用し、フォルダの走査は1回で済ませる）
+        fingerprint = BeginnerFriendlyYOLOEstimator.folder_fingerprint(folder_path)
+        analysis_key = (folder_path, target_accuracy, image_size, fingerprint)
         
-        status_text.text("🔍 ラベル状況を分析中...")
-        progress_bar.progress(50)
+        progress(50, "🔍 ラベル状況を分析中...")
         
-        result = estimator.get_simple_recommendation(
-            folder_path, target_accuracy, image_size
-        )
+        if st.session_state.get('_analysis_key') == analysis_key:
+            # 条件もフォルダの中身も前回と同じなら、保存済みの結果を使う
+            result = st.session_state['_analysis_result']
+        else:
+            folder_stats, class_stats = _cached_folder_scan(folder_path, fingerprint)
+            result = get_estimator().recommend_from_stats(
+                folder_stats, class_stats, target_accuracy, image_size
+            )
         
-        status_text.text("📊 結果を表示中...")
-        progress_bar.progress(75)
+        progress(75, "📊 結果を表示中...")
         
         # エラーチェック
         if result.get('エラー', False):
@@ -806,27 +955,28 @@ def analyze_and_display(folder_path: str, target_accuracy: str, image_size: int)
                 st.info(f"📝 {result['推奨開始数']}")
             return
         
-        # 結果表示
-        display_analysis_results(result)
+        # 結果をセッションに保存して表示（再実行時はここから表示する）
+        if st.session_state.get('_analysis_key') != analysis_key:
+            st.session_state['_analysis_key'] = analysis_key
+            st.session_state['_analysis_result'] = result
+            _report_timestamp('analysis', new=True)
         
-        progress_bar.progress(100)
-        status_text.text("✅ 分析完了！")
+        display_analysis_results(result)
         
-        # 少し待ってからクリア
-        import time
-        time.sleep(1)
-        progress_bar.empty()
-        status_text.empty()
+        # 完了通知はトースト（待たずにスクリプトを終える）
+        progress.clear()
+        st.toast("✅ 分析完了！")
         
     except Exception as e:
         st.error(f"❌ エラーが発生しました: {str(e)}")
         st.info("💡 フォルダパスが正しいか、ファイルが存在するか確認してください")
-        progress_bar.empty()
-        status_text.empty()
+        progress.clear()
 
 
+@_fragment
 def display_analysis_results(result: dict):
-    """分析結果の表示"""
+    """分析結果の表示（表示切替やダウンロードでは、この部分だけ再実行される）"""
+    import pandas as pd
     
     # 全体サマリー
     st.header("📊 全体サマリー")
@@ -864,10 +1014,6 @@ def display_analysis_results(result: dict):
             help="全画像のうちラベル付けされた画像の割合"
         )
     
-    # 進捗バー
-    progress_value = float(progress_val.replace('%', '')) / 100
-    st.progress(progress_value)
-    
     col1, col2 = st.columns(2)
     with col1:
         st.info(f"🎯 **目標精度**: {summary['目標精度']}")
@@ -877,102 +1023,161 @@ def display_analysis_results(result: dict):
     # クラス別詳細
     st.header("📈 クラス別詳細")
     
-    # データフレーム作成
-    df_data = []
-    for class_name, info in result['クラス別詳細'].items():
-        df_data.append({
-            'クラス名': class_name,
-            '現在の数': info['現在の数'],
-            '推奨数': info['推奨数'], 
-            '不足数': info['不足数'],
-            '進捗率': info['進捗率'],
-            '状態': info['状態'],
-            '次にやること': info['次にやること']
-        })
+    # データフレーム作成（列ごとのリストから一度に作る）
+    details = result['クラス別詳細']
+    infos = list(details.values())
+    df = pd.DataFrame({
+        'クラス名': list(details.keys()),
+        **{
+            column: [info[column] for info in infos]
+            for column in ('現在の数', '推奨数', '不足数', '進捗率', '状態', '次にやること')
+        }
+    })
     
-    df = pd.DataFrame(df_data)
+    # "85%" 形式の文字列を列ごとまとめて数値化（CSV出力用の df には列を足さない）
+    progress_values = df['進捗率'].str.rstrip('%').astype('float32')
     
-    # データフレーム表示
+    # データフレーム表示（進捗率は表の中にバーで表示）
     st.dataframe(
-        df[['クラス名', '現在の数', '推奨数', '不足数', '進捗率', '状態']], 
+        df[['クラス名', '現在の数', '推奨数', '不足数', '進捗率', '状態']].assign(進捗率=progress_values), 
         use_container_width=True,
-        hide_index=True
+        hide_index=True,
+        column_config={
+            '進捗率': st.column_config.ProgressColumn('進捗率', format='%.0f%%', min_value=0, max_value=100)
+        }
     )
     
     # グラフ表示
     st.subheader("📊 クラス別比較グラフ")
     
     # 棒グラフ
-    fig = px.bar(
-        df, 
-        x='クラス名', 
-        y=['現在の数', '推奨数'],
-        title="クラス別ラベル数比較",
-        barmode='group',
-        color_discrete_map={
-            '現在の数': '#1f77b4',
-            '推奨数': '#ff7f0e'
-        }
-    )
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = _make_class_bar_fig(df[['クラス名', '現在の数', '推奨数']])
+    st.plotly_chart(fig, **PLOTLY_CHART_OPTIONS)
     
     # 進捗円グラフ
-    progress_data = []
-    for class_name, info in result['クラス別詳細'].items():
-        progress_val = float(info['進捗率'].replace('%', ''))
-        progress_data.append({
-            'クラス名': class_name,
-            '進捗率': progress_val,
-            '完了': min(progress_val, 100),
-            '残り': max(0, 100 - progress_val)
-        })
-    
-    progress_df = pd.DataFrame(progress_data)
+    progress_df = pd.DataFrame({
+        'クラス名': df['クラス名'],
+        '進捗率': progress_values,
+        '完了': progress_values.clip(upper=100),
+        '残り': (100 - progress_values).clip(lower=0)
+    })
     
-    fig_pie = px.pie(
-        progress_df, 
-        values='完了', 
-        names='クラス名',
-        title="クラス別進捗率"
-    )
-    fig_pie.update_layout(height=400)
-    st.plotly_chart(fig_pie, use_container_width=True)
+    fig_pie = _make_progress_pie_fig(progress_df)
+    st.plotly_chart(fig_pie, **PLOTLY_CHART_OPTIONS)
     
     # 詳細アクション
     st.header("🎯 クラス別の次のアクション")
     
-    for class_name, info in result['クラス別詳細'].items():
-        with st.expander(f"📋 {class_name} ({info['状態']})"):
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                st.metric("不足数", info['不足数'])
-                st.metric("進捗", info['進捗率'])
-            
-            with col2:
-                st.write(f"**次にやること:** {info['次にやること']}")
-                st.write(f"**状態:** {info['状態']}")
+    # 既定は1つの表で表示（クラス数ぶんの展開パネルを作らない）
+    if st.checkbox("クラスごとの詳細ビューで表示", key="class_action_detail_view"):
+        for class_name, info in details.items():
+            with st.expander(f"📋 {class_name} ({info['状態']})"):
+                col1, col2 = st.columns([1, 2])
+                
+                with col1:
+                    st.metric("不足数", info['不足数'])
+                    st.metric("進捗", info['進捗率'])
+                
+                with col2:
+                    st.write(f"**次にやること:** {info['次にやること']}")
+                    st.write(f"**状態:** {info['状態']}")
+    else:
+        st.dataframe(
+            df[['クラス名', '状態', '不足数', '進捗率', '次にやること']],
+            use_container_width=True,
+            hide_index=True
+        )
     
     # 全体の次のステップ
     st.header("🚀 次にやること")
     
-    for i, step in enumerate(result['次のステップ'], 1):
-        st.write(f"**{i}.** {step}")
+    st.markdown(_numbered_markdown(result['次のステップ']))
     
     # レポートダウンロード機能
     st.header("📄 レポート出力")
     
-    # CSV形式
-    csv_data = df.to_csv(index=False, encoding='utf-8-sig')
+    # CSV形式（bytes に直接書き出す。文字列で返すと encoding が無視され BOM が付かない）
+    csv_buffer = io.BytesIO()
+    df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
+    csv_data = csv_buffer.getvalue()
     st.download_button(
         label="📊 CSV形式でダウンロード",
         data=csv_data,
-        file_name=f"yolo_analysis_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        file_name=f"yolo_analysis_{_report_timestamp('analysis')}.csv",
         mime='text/csv',
         help="Excelで開ける形式でデータをダウンロードします"
     )
 
 
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _make_class_bar_fig(df: 'pd.DataFrame'):
+    """クラス別ラベル数の棒グラフ（同じデータならグラフを作り直さない）"""
+    import plotly.graph_objects as go
+    
+    # px.bar を経由せず列から直接トレースを作る
+    class_names = df['クラス名'].tolist()
+    fig = go.Figure([
+        go.Bar(name='現在の数', x=class_names, y=df['現在の数'].tolist(), marker_color='#1f77b4'),
+        go.Bar(name='推奨数', x=class_names, y=df['推奨数'].tolist(), marker_color='#ff7f0e')
+    ])
+    # 再実行時もブラウザ側の表示状態（ズーム等）を維持
+    fig.update_layout(
+        title="クラス別ラベル数比較",
+        xaxis_title='クラス名',
+        yaxis_title='ラベル数',
+        barmode='group',
+        height=400,
+        uirevision='constant'
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _make_progress_pie_fig(progress_df: 'pd.DataFrame'):
+    """クラス別進捗率の円グラフ（同じデータならグラフを作り直さない）"""
+    import plotly.express as px
+    
+    fig_pie = px.pie(
+        progress_df, 
+        values='完了', 
+        names='クラス名',
+        title="クラス別進捗率"
+    )
+    fig_pie.update_layout(height=400, uirevision='constant')
+    return fig_pie
+
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _make_annotation_bar_fig(class_df: 'pd.DataFrame'):
+    """変換結果のクラス別アノテーション数の棒グラフ（同じデータならグラフを作り直さない）"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Bar(x=class_df['クラス名'].tolist(), y=class_df['アノテーション数'].tolist()))
+    fig.update_layout(
+        title="クラス別アノテーション数",
+        xaxis_title='クラス名',
+        yaxis_title='アノテーション数',
+        uirevision='constant'
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _make_resolution_bar_fig(resolution_df: 'pd.DataFrame'):
+    """品質チェックの解像度別画像数の棒グラフ（同じデータならグラフを作り直さない）"""
+    import plotly.express as px
+    
+    fig = px.bar(
+        resolution_df,
+        x='解像度',
+        y='画像数',
+        title="解像度別画像数"
+    )
+    fig.update_layout(height=400, uirevision='constant')
+    return fig
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,38 +7,72 @@ from pathlib import Path
 from typing import List, Tuple
 
 
-def get_image_json_pairs(folder_path: str) -> Tuple[List[str], List[str], List[Tuple[str, str]]]:
+# 対応する画像拡張子（小文字・ドットなし）
+IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'bmp', 'tiff', 'webp'})
+
+
+def scan_image_json_files(folder_path: str) -> Tuple[List[str], List[str], List[Tuple[str, str]]]:
     """
-    フォルダから画像ファイルとJSONファイルのペアを取得
+    フォルダを1回だけ走査して画像・JSONファイルを分類し、ペアを作成
+    
+    拡張子を除いたファイル名が同じ画像とJSONをペアにする（拡張子の大文字・小文字は区別しない）。
+    分析・変換・フォルダ確認はすべてこの関数で同じ規則を使う
     
     Args:
         folder_path: 対象フォルダパス
         
     Returns:
         (画像ファイルリスト, JSONファイルリスト, ペアリスト)
+        
+    Raises:
+        FileNotFoundError: フォルダが存在しない
     """
-    if not os.path.exists(folder_path):
-        return [], [], []
-    
-    all_files = os.listdir(folder_path)
-    
-    # 対応する拡張子
-    image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
+    image_files, json_files = [], []
+    image_stems = []      # 画像ファイル名から拡張子を除いたもの（image_files と同じ順）
+    json_by_stem = {}     # 拡張子を除いたファイル名 → JSONファイル名
+    
+    # 拡張子部分だけを小文字化して分類
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            
+            name = entry.name
+            stem, dot, ext = name.rpartition('.')
+            if not dot:
+                continue
+            
+            ext = ext.lower()
+            if ext in IMAGE_EXTENSIONS:
+                image_files.append(name)
+                image_stems.append(stem)
+            elif ext == 'json':
+                json_files.append(name)
+                json_by_stem[stem] = name
+    
+    pairs = [
+        (img_file, json_by_stem[stem])
+        for img_file, stem in zip(image_files, image_stems)
+        if stem in json_by_stem
+    ]
     
-    # ファイル分類
-    image_files = [f for f in all_files if f.lower().endswith(image_extensions)]
-    json_files = [f for f in all_files if f.lower().endswith('.json')]
+    return image_files, json_files, pairs
+
+
+def get_image_json_pairs(folder_path: str) -> Tuple[List[str], List[str], List[Tuple[str, str]]]:
+    """
+    フォルダから画像ファイルとJSONファイルのペアを取得
     
-    # ペア作成
-    pairs = []
-    for img_file in image_files:
-        img_name = os.path.splitext(img_file)[0]
-        json_name = img_name + '.json'
+    Args:
+        folder_path: 対象フォルダパス
         
-        if json_name in json_files:
-            pairs.append((img_file, json_name))
-    
-    return image_files, json_files, pairs
+    Returns:
+        (画像ファイルリスト, JSONファイルリスト, ペアリスト)（フォルダが無ければすべて空）
+    """
+    try:
+        return scan_image_json_files(folder_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return [], [], []
 
 
 def validate_folder_structure(folder_path: str) -> dict:
@@ -111,8 +145,20 @@ def get_folder_summary(folder_path: str) -> str:
     Returns:
         概要文字列
     """
-    validation = validate_folder_structure(folder_path)
+    return format_folder_summary(folder_path, validate_folder_structure(folder_path))
+
+
+def format_folder_summary(folder_path: str, validation: dict) -> str:
+    """
+    検証済みの結果からフォルダの概要文字列を作成（フォルダを再走査しない）
     
+    Args:
+        folder_path: 対象フォルダ
+        validation: validate_folder_structure の結果
+        
+    Returns:
+        概要文字列
+    """
     if not validation['valid']:
         return f"❌ エラー: {', '.join(validation['errors'])}"
     
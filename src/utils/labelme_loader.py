@@ -0,0 +1,201 @@
+"""
+labelme JSON 読み込みユーティリティ
+分析・変換の両方から使う共通ローダー（キャッシュ付き）
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+# orjson があれば高速パーサーを使う（無ければ標準の json）
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+
+# 解析結果キャッシュの既定の上限（バイト）
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class LabelmeAnnotation(NamedTuple):
+    """labelme JSONから必要な項目だけを抜き出したもの"""
+    image_width: Optional[int]
+    image_height: Optional[int]
+    boxes: Tuple[Tuple[str, float, float, float, float], ...]  # (ラベル, x1, y1, x2, y2)
+
+
+class _FrequencySketch:
+    """アクセス頻度の概算（4ビット上限の Count-Min Sketch、定期的に半減させて古い頻度を忘れる）"""
+    
+    DEPTH = 4
+    MAX_COUNT = 15
+    
+    def __init__(self, width: int = 4096):
+        self.width = width
+        self.counters = [bytearray(width) for _ in range(self.DEPTH)]
+        self.additions = 0
+        self.reset_at = width * 10
+    
+    def _indexes(self, item: Hashable):
+        for row in range(self.DEPTH):
+            yield row, hash((row, item)) % self.width
+    
+    def increment(self, item: Hashable):
+        for row, col in self._indexes(item):
+            if self.counters[row][col] < self.MAX_COUNT:
+                self.counters[row][col] += 1
+        
+        self.additions += 1
+        if self.additions >= self.reset_at:
+            self._halve()
+    
+    def estimate(self, item: Hashable) -> int:
+        return min(self.counters[row][col] for row, col in self._indexes(item))
+    
+    def _halve(self):
+        for row in self.counters:
+            row[:] = bytes(count >> 1 for count in row)
+        self.additions //= 2
+
+
+class _LabelmeCache:
+    """
+    解析済みlabelmeの保持キャッシュ
+    
+    保持量はエントリ数ではなく推定バイト数で制限（LRUで追い出し）。
+    満杯時は TinyLFU 方式で、追い出し候補よりアクセス頻度が高いものだけを追加する。
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()  # キー → (解析結果, 推定バイト数)
+        self.sketch = _FrequencySketch()
+        self.lock = threading.Lock()
+    
+    def get(self, key: Tuple[str, int, int]) -> Optional[LabelmeAnnotation]:
+        with self.lock:
+            # 頻度はパス単位で数える（更新されたファイルも人気度を引き継ぐ）
+            self.sketch.increment(key[0])
+            
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            
+            self.entries.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key: Tuple[str, int, int], annotation: LabelmeAnnotation):
+        nbytes = _estimate_size(annotation)
+        
+        with self.lock:
+            if key in self.entries or nbytes > self.max_bytes:
+                return
+            
+            # 空きが足りるまで古い順に追い出し候補を集めてから、追加するかを決める
+            victims = []
+            freed = 0
+            for victim_key, (_, victim_bytes) in self.entries.items():
+                if self.total_bytes - freed + nbytes <= self.max_bytes:
+                    break
+                victims.append(victim_key)
+                freed += victim_bytes
+            
+            # 追い出し候補のどれかの方がよく使われているなら、何も追い出さず追加もしない（TinyLFU）
+            candidate_freq = self.sketch.estimate(key[0])
+            if any(self.sketch.estimate(victim_key[0]) >= candidate_freq for victim_key in victims):
+                return
+            
+            for victim_key in victims:
+                _, victim_bytes = self.entries.pop(victim_key)
+                self.total_bytes -= victim_bytes
+            
+            self.entries[key] = (annotation, nbytes)
+            self.total_bytes += nbytes
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+_cache = _LabelmeCache()
+
+
+def load_labelme(json_path: str) -> LabelmeAnnotation:
+    """
+    labelme JSONファイルを読み込み、矩形アノテーションを抽出
+    
+    同じファイル（パス・更新時刻・サイズが同一）は再パースせずキャッシュを返す
+    
+    Args:
+        json_path: labelme JSONファイルパス
+    
+    Returns:
+        画像サイズと矩形(ラベル, x1, y1, x2, y2)の一覧
+    """
+    st = os.stat(json_path)
+    key = (json_path, st.st_mtime_ns, st.st_size)
+    
+    annotation = _cache.get(key)
+    if annotation is None:
+        annotation = _parse_labelme(json_path)
+        _cache.put(key, annotation)
+    
+    return annotation
+
+
+def set_cache_limit(max_bytes: int):
+    """
+    解析結果キャッシュの上限（バイト）を変更
+    
+    Args:
+        max_bytes: 保持する解析結果の推定合計サイズの上限（0でキャッシュ無効）
+    """
+    global _cache
+    _cache = _LabelmeCache(max_bytes)
+
+
+def clear_cache():
+    """解析結果キャッシュを空にする"""
+    _cache.clear()
+
+
+def _parse_labelme(json_path: str) -> LabelmeAnnotation:
+    """labelme JSONを解析して必要な項目だけを取り出す"""
+    with open(json_path, 'rb') as f:
+        data = _loads(f.read())
+    
+    if not isinstance(data, dict):
+        raise ValueError("labelme形式のJSONではありません")
+    
+    # 矩形(rectangle)かつラベル名があるものだけを保持
+    boxes = []
+    for shape in data.get('shapes', []):
+        if shape.get('shape_type') == 'rectangle':
+            label = shape.get('label', '').strip()
+            if label:
+                points = shape['points']
+                x1, y1 = points[0]
+                x2, y2 = points[1]
+                boxes.append((label, float(x1), float(y1), float(x2), float(y2)))
+    
+    return LabelmeAnnotation(
+        image_width=data.get('imageWidth'),
+        image_height=data.get('imageHeight'),
+        boxes=tuple(boxes)
+    )
+
+
+def _estimate_size(annotation: LabelmeAnnotation) -> int:
+    """解析結果が保持するメモリ量の概算（バイト）"""
+    float_bytes = sys.getsizeof(0.0)
+    size = sys.getsizeof(annotation) + sys.getsizeof(annotation.boxes)
+    
+    for box in annotation.boxes:
+        size += sys.getsizeof(box) + sys.getsizeof(box[0]) + 4 * float_bytes
+    
+    return size
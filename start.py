@@ -1,61 +1,112 @@
 #!/usr/bin/env python3
 """
 YOLO データセット分析ツール 起動スクリプト
+
+使い方:
+    python start.py                 # 確認してから起動
+    python start.py --skip-checks   # ファイル・依存関係の確認と起動時の表示を省いてすぐ起動
+                                    # （環境変数 YOLO_SKIP_DEPCHECK=1 / true / yes でも同じ）
+    python start.py --spawn         # Streamlit を別プロセスとして起動（デバッグ用）
+    python start.py --server.port 8600  # その他の引数はそのまま Streamlit に渡す
 """
 
 import os
 import sys
-import subprocess
-from pathlib import Path
+
+
+# 起動前に確認するライブラリ（配布パッケージ名）
+# pandas・numpy・pillow は streamlit の依存ライブラリなので、streamlit があれば入っている
+REQUIRED_PACKAGES = ("streamlit", "plotly")
+
+# 起動前の確認・表示を省くオプション・環境変数（環境変数は SKIP_CHECKS_ENV_VALUES のどれかのときだけ有効）
+SKIP_CHECKS_FLAG = "--skip-checks"
+SKIP_CHECKS_ENV = "YOLO_SKIP_DEPCHECK"
+SKIP_CHECKS_ENV_VALUES = ("1", "true", "yes")
+
+# Streamlitを別プロセスで起動するオプション（既定はこのプロセス内で起動）
+SPAWN_FLAG = "--spawn"
+
+# Streamlitの既定の設定（環境変数で渡す。起動引数や利用者が設定した環境変数の方が優先される）
+DEFAULT_PORT = 8501
+DEFAULT_STREAMLIT_ENV = {
+    "STREAMLIT_BROWSER_SERVER_ADDRESS": "localhost",
+    "STREAMLIT_THEME_BASE": "light",
+}
+
+# 既定ポートが使用中のとき、順に空きを探す個数
+PORT_SEARCH_COUNT = 10
+
+# 依存関係チェックに成功したときの記録（Python本体と requirements.txt が変わるまで再チェックしない）
+DEPS_OK_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'yolo-analyzer', 'start_deps_ok')
 
 
 def main():
     """メイン起動関数"""
-    print("🎯 YOLO データセット分析ツール")
-    print("=" * 50)
-    
     # プロジェクトルートを取得
-    project_root = Path(__file__).parent
-    ui_path = project_root / "src" / "ui" / "streamlit_app.py"
-    
-    # パス確認
-    if not ui_path.exists():
-        print(f"❌ エラー: UIファイルが見つかりません: {ui_path}")
-        return
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    ui_path = os.path.join(project_root, "src", "ui", "streamlit_app.py")
     
-    # 依存関係チェック
-    print("📦 依存関係をチェック中...")
-    
-    try:
-        import streamlit
-        import pandas
-        import plotly
-        import numpy
-        import PIL
-        print("✅ 必要なライブラリがインストールされています")
-    except ImportError as e:
-        print(f"❌ 必要なライブラリが不足しています: {e}")
-        print("💡 以下のコマンドでインストールしてください:")
-        print(f"   pip install -r {project_root / 'requirements.txt'}")
-        return
+    # 起動スクリプト用のオプション（Streamlitには渡さないので起動引数から取り除く）
+    skip_checks = (
+        os.environ.get(SKIP_CHECKS_ENV, "").strip().lower() in SKIP_CHECKS_ENV_VALUES
+        or SKIP_CHECKS_FLAG in sys.argv[1:]
+    )
+    spawn = SPAWN_FLAG in sys.argv[1:]
+    sys.argv[1:] = [arg for arg in sys.argv[1:] if arg not in (SKIP_CHECKS_FLAG, SPAWN_FLAG)]
     
-    # Streamlit起動
-    print("🚀 Streamlitを起動中...")
-    print("📱 ブラウザが自動で開きます")
-    print("🔄 終了するには Ctrl+C を押してください")
-    print("-" * 50)
+    if not skip_checks:
+        # 表示はまとめて1回で出力する
+        print("🎯 YOLO データセット分析ツール\n" + "=" * 50)
+        
+        # パス確認
+        if not os.path.isfile(ui_path):
+            print(f"❌ エラー: UIファイルが見つかりません: {ui_path}")
+            return
+        
+        # 依存関係チェック（インストール情報だけを読み、起動側のプロセスではライブラリを読み込まない）
+        print("📦 依存関係をチェック中...")
+        
+        missing = find_missing_packages(project_root)
+        if missing:
+            print(
+                f"❌ 必要なライブラリが不足しています: {', '.join(missing)}\n"
+                "💡 以下のコマンドでインストールしてください:\n"
+                f"   pip install -r {os.path.join(project_root, 'requirements.txt')}"
+            )
+            return
+        
+        print(
+            "✅ 必要なライブラリがインストールされています\n"
+            "🚀 Streamlitを起動中...\n"
+            "📱 ブラウザが自動で開きます\n"
+            "🔄 終了するには Ctrl+C を押してください\n"
+            + "-" * 50
+        )
     
     try:
-        # Streamlitコマンド実行
-        cmd = [
-            sys.executable, "-m", "streamlit", "run", 
-            str(ui_path),
-            "--server.port", "8501",
-            "--browser.serverAddress", "localhost",
-            "--theme.base", "light"
-        ]
+        # Streamlitコマンド実行（起動引数はそのまま渡し、既定値は環境変数で補う）
+        extra_args = sys.argv[1:]
+        streamlit_args = ["run", ui_path] + extra_args
         
-        subprocess.run(cmd, cwd=str(project_root))
+        for name, value in DEFAULT_STREAMLIT_ENV.items():
+            os.environ.setdefault(name, value)
+        
+        port_given = any(arg == "--server.port" or arg.startswith("--server.port=") for arg in extra_args)
+        if not port_given and "STREAMLIT_SERVER_PORT" not in os.environ:
+            # 既定ポートが使用中なら、Streamlitを読み込む前に空いているポートへ切り替える
+            os.environ["STREAMLIT_SERVER_PORT"] = str(find_free_port(DEFAULT_PORT))
+        
+        if spawn:
+            # 子プロセスとして起動して終了を待つ（subprocess は起動するときだけ読み込む）
+            import subprocess
+            subprocess.run([sys.executable, "-m", "streamlit"] + streamlit_args, cwd=project_root)
+        else:
+            # このプロセス内で Streamlit のCLIを実行（Pythonの起動とライブラリの読み込みが1回で済み、Ctrl+C も直接届く）
+            from streamlit.web import cli as streamlit_cli
+            
+            os.chdir(project_root)
+            sys.argv = ["streamlit"] + streamlit_args
+            sys.exit(streamlit_cli.main())
         
     except KeyboardInterrupt:
         print("\n👋 ツールを終了しました")
@@ -63,5 +114,69 @@ def main():
         print(f"❌ エラーが発生しました: {e}")
 
 
+def find_free_port(start_port: int) -> int:
+    """
+    start_port から順に、接続を受け付けていない（空いている）ポートを探す
+    
+    見つからなければ start_port を返す（Streamlit側のエラー表示に任せる）
+    """
+    import socket
+    
+    for port in range(start_port, start_port + PORT_SEARCH_COUNT):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.05)
+            if sock.connect_ex(("127.0.0.1", port)) != 0:
+                if port != start_port:
+                    print(f"💡 ポート {start_port} は使用中のため {port} で起動します")
+                return port
+    
+    return start_port
+
+
+def find_missing_packages(project_root: str) -> list:
+    """
+    インストールされていない必要ライブラリを返す
+    
+    前回の成功時から Python本体・requirements.txt が変わっていなければ、
+    記録ファイルを1回読むだけで済ませる
+    """
+    try:
+        key = "{}:{}:{}".format(
+            sys.executable,
+            os.stat(sys.executable).st_mtime_ns,
+            os.stat(os.path.join(project_root, 'requirements.txt')).st_mtime_ns
+        )
+    except OSError:
+        key = None
+    
+    if key is not None:
+        try:
+            with open(DEPS_OK_PATH, encoding='utf-8') as f:
+                if f.read() == key:
+                    return []
+        except OSError:
+            pass
+    
+    # 記録が無い・古い場合はインストール情報を確認（ライブラリ本体は読み込まない）
+    from importlib.metadata import version, PackageNotFoundError
+    
+    missing = []
+    for package in REQUIRED_PACKAGES:
+        try:
+            version(package)
+        except PackageNotFoundError:
+            missing.append(package)
+    
+    if not missing and key is not None:
+        try:
+            os.makedirs(os.path.dirname(DEPS_OK_PATH), exist_ok=True)
+            with open(DEPS_OK_PATH, 'w', encoding='utf-8') as f:
+                f.write(key)
+        except OSError:
+            pass  # 記録できなくても起動には影響しない
+    
+    return missing
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+テスト共通設定
+"""
+
+import sys
+from pathlib import Path
+
+# アプリ本体と同じく src 直下のパッケージを import できるようにする
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
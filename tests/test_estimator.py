@@ -0,0 +1,41 @@
+"""
+ラベル推定器のテスト
+"""
+
+import os
+
+from analyzer.estimator import BeginnerFriendlyYOLOEstimator
+
+
+def test_folder_fingerprint_skips_dangling_symlink(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"x")
+    before = BeginnerFriendlyYOLOEstimator.folder_fingerprint(str(tmp_path))
+    
+    os.symlink(tmp_path / "missing.jpg", tmp_path / "broken.jpg")
+    
+    assert BeginnerFriendlyYOLOEstimator.folder_fingerprint(str(tmp_path)) == before
+
+
+def test_folder_fingerprint_changes_on_rename(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"x")
+    before = BeginnerFriendlyYOLOEstimator.folder_fingerprint(str(tmp_path))
+    
+    os.rename(tmp_path / "a.jpg", tmp_path / "b.jpg")
+    
+    assert BeginnerFriendlyYOLOEstimator.folder_fingerprint(str(tmp_path)) != before
+
+
+def test_analysis_cache_keeps_one_file_per_folder(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    folder = tmp_path / "data"
+    folder.mkdir()
+    monkeypatch.setattr(BeginnerFriendlyYOLOEstimator, "CACHE_DIR", str(cache_dir))
+    estimator = BeginnerFriendlyYOLOEstimator()
+    
+    (folder / "a.jpg").write_bytes(b"x")
+    estimator.analyze_folder_and_classes(str(folder))
+    (folder / "b.jpg").write_bytes(b"x")
+    folder_stats, _ = estimator.analyze_folder_and_classes(str(folder))
+    
+    assert folder_stats['全画像数'] == 2
+    assert len(os.listdir(cache_dir)) == 1
@@ -0,0 +1,26 @@
+"""
+ファイル操作ユーティリティのテスト
+"""
+
+from analyzer.estimator import BeginnerFriendlyYOLOEstimator
+from converter.yolo_converter import YOLOConverter
+from utils.file_utils import get_image_json_pairs, validate_folder_structure
+
+
+def test_json_extension_case_is_ignored_everywhere(tmp_path):
+    for name in ("a.JPG", "a.JSON", "b.png", "b.json", "c.jpg"):
+        (tmp_path / name).write_bytes(b"")
+    folder = str(tmp_path)
+    
+    _, _, pairs = get_image_json_pairs(folder)
+    folder_stats = BeginnerFriendlyYOLOEstimator(use_cache=False).analyze_mixed_folder(folder)
+    
+    assert sorted(pairs) == [("a.JPG", "a.JSON"), ("b.png", "b.json")]
+    assert sorted(YOLOConverter()._get_image_json_pairs(folder)) == sorted(pairs)
+    assert sorted(folder_stats['labeled_pairs']) == sorted(pairs)
+    assert folder_stats['unlabeled_images'] == ["c.jpg"]
+    assert validate_folder_structure(folder)['info']['ペア数'] == 2
+
+
+def test_missing_folder_returns_empty_lists(tmp_path):
+    assert get_image_json_pairs(str(tmp_path / "missing")) == ([], [], [])
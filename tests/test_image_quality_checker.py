@@ -0,0 +1,65 @@
+"""
+画像品質チェックのテスト
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+from quality.image_quality_checker import ImageQualityChecker, _blur_score
+
+
+def _textured_image(height: int, width: int) -> np.ndarray:
+    """細かい模様のある（ぼけていない）グレースケール画像"""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(height, width), dtype=np.uint8)
+
+
+def _native_blur_score(gray: np.ndarray) -> float:
+    """画像全体の Laplacian の分散（縮小・間引きなし）"""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def test_blur_score_matches_native_resolution_for_large_image():
+    sharp = _textured_image(2160, 3840)
+    blurred = cv2.GaussianBlur(sharp, (0, 0), 5)
+    
+    for gray in (sharp, blurred):
+        native = _native_blur_score(gray)
+        assert abs(_blur_score(gray) - native) <= native * 0.1
+
+
+def test_blurred_high_resolution_image_is_below_blur_threshold():
+    thresholds = ImageQualityChecker(use_cache=False).quality_thresholds
+    sharp = _textured_image(2160, 3840)
+    
+    assert _blur_score(sharp) >= thresholds['blur_warning']
+    for sigma in (5, 10):
+        assert _blur_score(cv2.GaussianBlur(sharp, (0, 0), sigma)) < thresholds['blur_threshold']
+
+
+def test_blurred_high_resolution_jpeg_is_flagged(tmp_path):
+    sharp = cv2.cvtColor(_textured_image(2160, 3840), cv2.COLOR_GRAY2BGR)
+    cv2.imwrite(str(tmp_path / "sharp.jpg"), sharp)
+    cv2.imwrite(str(tmp_path / "blurred.jpg"), cv2.GaussianBlur(sharp, (0, 0), 3))
+    
+    result = ImageQualityChecker(use_cache=False).check_dataset_quality(str(tmp_path))
+    
+    blurry = [issue['ファイル名'] for issue in result['品質問題']['ぼけ画像']]
+    assert blurry == ["blurred.jpg"]
+
+
+def test_symlinked_images_are_checked(tmp_path):
+    store, dataset = tmp_path / "store", tmp_path / "dataset"
+    store.mkdir()
+    dataset.mkdir()
+    cv2.imwrite(str(store / "shared.png"), cv2.cvtColor(_textured_image(480, 640), cv2.COLOR_GRAY2BGR))
+    cv2.imwrite(str(dataset / "local.png"), cv2.cvtColor(_textured_image(480, 640), cv2.COLOR_GRAY2BGR))
+    os.symlink(store / "shared.png", dataset / "shared.png")
+    os.symlink(store / "missing.png", dataset / "broken.png")
+    
+    result = ImageQualityChecker(use_cache=False).check_dataset_quality(str(dataset))
+    
+    assert result['総画像数'] == 2
+    assert result['品質問題']['読み込みエラー'] == []
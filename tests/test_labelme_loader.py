@@ -0,0 +1,63 @@
+"""
+labelme 読み込みキャッシュのテスト
+"""
+
+from utils.labelme_loader import LabelmeAnnotation, _LabelmeCache, _estimate_size
+
+
+def _annotation(box_count: int) -> LabelmeAnnotation:
+    boxes = tuple(('obj', 0.0, 0.0, 1.0, 1.0) for _ in range(box_count))
+    return LabelmeAnnotation(image_width=640, image_height=480, boxes=boxes)
+
+
+def _touch(cache: _LabelmeCache, key, times: int):
+    """アクセス頻度を上げる"""
+    for _ in range(times):
+        cache.get(key)
+
+
+def _full_cache():
+    """1ボックスの解析結果2件で満杯のキャッシュと、2件とも追い出さないと入らない追加候補"""
+    small, large = _annotation(1), _annotation(2)
+    cache = _LabelmeCache(max_bytes=2 * _estimate_size(small))
+    assert _estimate_size(small) < _estimate_size(large) <= cache.max_bytes
+    
+    old, new = ('old.json', 0, 0), ('new.json', 0, 0)
+    cache.put(old, small)
+    cache.put(new, small)
+    return cache, old, new, ('candidate.json', 0, 0), large
+
+
+def test_single_victim_evicted_for_hotter_candidate():
+    small = _annotation(1)
+    cache = _LabelmeCache(max_bytes=_estimate_size(small))
+    old, candidate = ('old.json', 0, 0), ('candidate.json', 0, 0)
+    cache.put(old, small)
+    
+    _touch(cache, candidate, 3)
+    cache.put(candidate, small)
+    
+    assert list(cache.entries) == [candidate]
+    assert cache.total_bytes == _estimate_size(small)
+
+
+def test_multi_victim_all_evicted_for_hotter_candidate():
+    cache, old, new, candidate, large = _full_cache()
+    
+    _touch(cache, candidate, 3)
+    cache.put(candidate, large)
+    
+    assert list(cache.entries) == [candidate]
+    assert cache.total_bytes == _estimate_size(large)
+
+
+def test_multi_victim_none_evicted_when_any_victim_is_hotter():
+    cache, old, new, candidate, large = _full_cache()
+    
+    # 1件目の追い出し候補は冷たいが、2件目は追加候補よりよく使われている
+    _touch(cache, candidate, 2)
+    _touch(cache, new, 5)
+    cache.put(candidate, large)
+    
+    assert list(cache.entries) == [old, new]
+    assert cache.total_bytes == cache.max_bytes